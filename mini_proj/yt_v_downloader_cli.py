@@ -10,6 +10,7 @@ Features:
  - Choose output directory
  - Shows progress (percent, speed, ETA) in console using yt-dlp progress hooks
  - Optional browser or cookie-file auth for YouTube bot checks
+ - Optional parallel downloads (--jobs) with a per-host cap (--per-host)
 
 Dependencies:
     pip install yt-dlp
@@ -19,14 +20,19 @@ Examples:
     python yt_v_downloader_cli.py "https://youtu.be/xxxx" --resolution 720p
     python yt_v_downloader_cli.py url1 url2 --outdir /home/user/Downloads
     python yt_v_downloader_cli.py --cookies-from-browser chrome "https://youtu.be/xxxx"
+    python yt_v_downloader_cli.py --batch-file urls.txt --jobs 6 --per-host 3 --yes
     python yt_v_downloader_cli.py    # will prompt for URL(s)
 """
 
 import argparse
 import os
 import sys
+import threading
+import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
+from urllib.parse import urlparse
 
 try:
     import yt_dlp as ytdl
@@ -106,6 +112,9 @@ class CLIDownloader:
         quiet=False,
         cookies_from_browser=None,
         cookies_file=None,
+        jobs=1,
+        per_host=None,
+        progress_interval=1.0,
     ):
         self.outdir = outdir
         self.format_choice = fmt_choice
@@ -114,6 +123,13 @@ class CLIDownloader:
         self.cookies_from_browser = (cookies_from_browser or "").strip().lower()
         self.cookies_file = cookies_file
         self.last_line_len = 0
+        self.jobs = max(1, jobs)
+        self.per_host = per_host
+        self.progress_interval = progress_interval
+        self._print_lock = threading.Lock()
+        self._host_lock = threading.Lock()
+        self._host_slots = {}
+        self._cancel = threading.Event()
 
         self.ydl_opts = {
             "format": format_selector(fmt_choice),
@@ -134,6 +150,31 @@ class CLIDownloader:
             self.ydl_opts["cookiefile"] = self.cookies_file
 
     def _progress_hook(self, data):
+        line = self._progress_line(data)
+        if line:
+            self._print_inline(line)
+
+    def _make_progress_hook(self, job_id):
+        """Progress hook for one parallel job: whole lines, at most one
+        'downloading' line per progress_interval seconds. Raises
+        DownloadCancelled once the run is cancelled so the job stops."""
+        last_print = [0.0]
+
+        def hook(data):
+            if self._cancel.is_set():
+                raise ytdl.utils.DownloadCancelled("Cancelled by user.")
+            if data.get("status") == "downloading":
+                now = time.monotonic()
+                if now - last_print[0] < self.progress_interval:
+                    return
+                last_print[0] = now
+            line = self._progress_line(data)
+            if line:
+                self._report(line, job_id)
+
+        return hook
+
+    def _progress_line(self, data):
         status = data.get("status")
         if status == "downloading":
             downloaded = data.get("downloaded_bytes") or data.get("downloaded") or 0
@@ -153,19 +194,40 @@ class CLIDownloader:
                     f"Downloading: {human_readable_size(downloaded)} downloaded | "
                     f"{human_readable_size(speed)}/s | ETA: {human_time(eta)}"
                 )
-
-            self._print_inline(line)
-        elif status == "finished":
+            return line
+        if status == "finished":
             filename = data.get("filename", "")
-            self._print_inline("Finished downloading part -> " + os.path.basename(filename))
-        elif status == "error":
-            self._print_inline("Error in download.")
+            return "Finished downloading part -> " + os.path.basename(filename)
+        if status == "error":
+            return "Error in download."
+        return None
 
     def _print_inline(self, text: str):
         sys.stdout.write("\r" + text + " " * max(0, self.last_line_len - len(text)))
         sys.stdout.flush()
         self.last_line_len = len(text)
 
+    def _report(self, text: str, job_id=None, stream=None):
+        """Print a message as-is, or for a parallel job as whole lines
+        prefixed with the job id so concurrent jobs never share a line."""
+        stream = stream or sys.stdout
+        if job_id is None:
+            print(text, file=stream)
+            return
+        lines = [line for line in text.strip("\r\n").splitlines() if line.strip()]
+        with self._print_lock:
+            for line in lines:
+                print(f"[{job_id}] {line}", file=stream)
+            stream.flush()
+
+    def _report_error(self, url, error, job_id=None):
+        self._report(f"\nError processing {url}:\n  {self._friendly_error(error)}\n", job_id)
+        if not self.quiet:
+            if job_id is None:
+                traceback.print_exc()
+            else:
+                self._report(traceback.format_exc(), job_id, sys.stderr)
+
     def _friendly_error(self, error):
         error_text = str(error)
         lower_error = error_text.lower()
@@ -185,51 +247,97 @@ class CLIDownloader:
             and "requested format is not available" in str(error).lower()
         )
 
-    def _download_url(self, url, fmt_choice):
+    def _download_url(self, url, fmt_choice, job_id=None):
         opts = dict(self.ydl_opts)
         opts["format"] = format_selector(fmt_choice)
+        if job_id is not None:
+            opts["progress_hooks"] = [self._make_progress_hook(job_id)]
         with ytdl.YoutubeDL(opts) as ydl:
             info = ydl.extract_info(url, download=False)
             title = info.get("title", url)
-            print(f"\nProcessing: {url}")
-            print(f"Downloading: {title}")
+            self._report(f"\nProcessing: {url}", job_id)
+            self._report(f"Downloading: {title}", job_id)
             ydl.download([url])
             return title
 
+    def _process_url(self, url, job_id=None):
+        """Download one URL, retrying with 'best' if the requested format is
+        missing. Errors are reported here so they never affect other URLs.
+        Returns True on success."""
+        try:
+            title = self._download_url(url, self.format_choice, job_id)
+        except ytdl.utils.DownloadCancelled:
+            self._report("Cancelled.", job_id)
+            return False
+        except ytdl.utils.DownloadError as error:
+            if not self._should_fallback_format(error):
+                self._report_error(url, error, job_id)
+                return False
+            self._report(f"\nRequested format '{self.format_choice}' is not available for this video.", job_id)
+            self._report("Retrying with best available quality...", job_id)
+            try:
+                title = self._download_url(url, "best", job_id)
+            except Exception as fallback_error:
+                self._report_error(url, fallback_error, job_id)
+                return False
+        except Exception as error:
+            self._report_error(url, error, job_id)
+            return False
+        self._report(f"\r\nDownload complete: {title}\n", job_id)
+        return True
+
+    @staticmethod
+    def _host(url):
+        """Lower-cased host of a URL, with or without a scheme ('' if none)."""
+        return (urlparse(url if "://" in url else "//" + url).hostname or "").lower()
+
+    def _host_slot(self, url):
+        """Semaphore limiting concurrent downloads from the URL's host."""
+        host = self._host(url)
+        with self._host_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return slot
+
+    def _run_job(self, job_id, url):
+        if not self.per_host:
+            return not self._cancel.is_set() and self._process_url(url, job_id)
+        with self._host_slot(url):
+            return not self._cancel.is_set() and self._process_url(url, job_id)
+
+    def _download_parallel(self, urls):
+        jobs = list(enumerate(urls, 1))
+        if self.per_host:
+            # interleave hosts so workers are not all parked on one host's cap
+            by_host = {}
+            for job in jobs:
+                by_host.setdefault(self._host(job[1]), []).append(job)
+            queues = list(by_host.values())
+            jobs = [queue[i] for i in range(max(map(len, queues))) for queue in queues if i < len(queue)]
+        cap = f", at most {self.per_host} per host" if self.per_host else ""
+        print(f"\nRunning {min(self.jobs, len(urls))} downloads at a time{cap}.")
+        pool = ThreadPoolExecutor(max_workers=self.jobs)
+        try:
+            futures = [pool.submit(self._run_job, job_id, url) for job_id, url in jobs]
+            succeeded = sum(future.result() for future in futures)
+        except KeyboardInterrupt:
+            # queued jobs are dropped; running ones stop at their next progress update
+            self._cancel.set()
+            print("\nCancelling running downloads...")
+            pool.shutdown(cancel_futures=True)
+            raise
+        pool.shutdown()
+        print(f"\n{succeeded}/{len(urls)} downloads completed.")
+
     def download(self, urls):
+        urls = [url for url in urls if url.strip()]
         try:
-            for url in urls:
-                if not url.strip():
-                    continue
-
-                try:
-                    title = self._download_url(url, self.format_choice)
-                    print(f"\r\nDownload complete: {title}\n")
-                except ytdl.utils.DownloadError as error:
-                    if self._should_fallback_format(error):
-                        print(
-                            f"\nRequested format '{self.format_choice}' is not available for this video."
-                        )
-                        print("Retrying with best available quality...")
-                        try:
-                            title = self._download_url(url, "best")
-                            print(f"\r\nDownload complete: {title}\n")
-                            continue
-                        except Exception as fallback_error:
-                            print(
-                                f"\nError processing {url}:\n  {self._friendly_error(fallback_error)}\n"
-                            )
-                            if not self.quiet:
-                                traceback.print_exc()
-                            continue
-
-                    print(f"\nError processing {url}:\n  {self._friendly_error(error)}\n")
-                    if not self.quiet:
-                        traceback.print_exc()
-                except Exception as error:
-                    print(f"\nError processing {url}:\n  {self._friendly_error(error)}\n")
-                    if not self.quiet:
-                        traceback.print_exc()
+            if self.jobs > 1 and len(urls) > 1:
+                self._download_parallel(urls)
+            else:
+                for url in urls:
+                    self._process_url(url)
         except KeyboardInterrupt:
             print("\nInterrupted by user.")
         except Exception as error:
@@ -270,6 +378,18 @@ def parse_args():
         "--cookies-file",
         help="Path to a cookies.txt file exported in Netscape format.",
     )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Number of downloads to run at the same time (default: 1).",
+    )
+    parser.add_argument(
+        "--per-host",
+        type=int,
+        help="Maximum simultaneous downloads from one host (default: no limit beyond --jobs).",
+    )
     return parser.parse_args()
 
 
@@ -280,6 +400,10 @@ def main():
         print(f"Cookies file '{args.cookies_file}' not found.")
         sys.exit(1)
 
+    if args.jobs < 1 or (args.per_host is not None and args.per_host < 1):
+        print("--jobs and --per-host must be at least 1.")
+        sys.exit(1)
+
     if args.cookies_from_browser and args.cookies_file:
         print("Using browser cookies and ignoring --cookies-file.")
 
@@ -325,6 +449,8 @@ def main():
     print(f"Output directory: {outdir}")
     print(f"Format choice: {args.resolution}")
     print(f"URLs to download: {len(final_urls)}")
+    if args.jobs > 1:
+        print(f"Parallel downloads: {args.jobs}" + (f" ({args.per_host} per host)" if args.per_host else ""))
     if args.cookies_from_browser:
         print(f"Browser cookies: {args.cookies_from_browser}")
     elif args.cookies_file:
@@ -345,6 +471,8 @@ def main():
         quiet=args.quiet,
         cookies_from_browser=args.cookies_from_browser,
         cookies_file=args.cookies_file,
+        jobs=args.jobs,
+        per_host=args.per_host,
     )
     downloader.download(final_urls)
 
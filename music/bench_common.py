@@ -0,0 +1,36 @@
+"""
+bench_common.py
+Baseline handling shared by the bench_*.py scripts.
+
+A baseline is a JSON object mapping a result key (built by the caller's
+key function) to the result dict of that run.
+"""
+
+import json
+
+
+def save_baseline(path, results, key):
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump({key(r): r for r in results}, handle, indent=2)
+
+
+def load_baseline(path):
+    with open(path, "r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def compare(results, baseline, tolerance, key, metric):
+    """Print results[metric] (a rate, higher is better) relative to the
+    baseline and return the keys that dropped by more than tolerance."""
+    regressions = []
+    for result in results:
+        old = baseline.get(key(result))
+        if not old or not old.get(metric) or not result.get(metric):
+            continue
+        ratio = result[metric] / old[metric]
+        flag = ""
+        if ratio < 1.0 - tolerance:
+            flag = "  REGRESSION"
+            regressions.append(key(result))
+        print(f"{key(result):40} {ratio:6.2f}x{flag}")
+    return regressions
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+bench_memory_allocation.py
+Throughput benchmark for the allocators in memory_allocation.py.
+
+Generates seeded block/process workloads (uniform, power-law and bimodal
+sizes) at 10^3-10^6 blocks and times allocate_first_fit, allocate_best_fit,
+allocate_worst_fit and their indexed variants. The linear versions cost
+O(B) per process, so they are timed on the last --linear-sample processes
+only, starting from the heap the indexed version left after placing the
+earlier ones; the indexed versions run the whole workload. Outputs must
+agree on that tail and on the first --linear-sample processes. Every run is
+reported per process (us/proc and ops/s), and indexed rows show their
+speedup as linear us/proc over indexed us/proc. Results can be saved as a
+baseline JSON and compared against on later runs (exit status 1 on a
+regression).
+
+Examples:
+    python bench_memory_allocation.py
+    python bench_memory_allocation.py --sizes 1000 100000 1000000 --workload bimodal
+    python bench_memory_allocation.py --save-baseline alloc_baseline.json
+    python bench_memory_allocation.py --baseline alloc_baseline.json
+"""
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+
+import memory_allocation as ma
+from bench_common import compare, load_baseline, save_baseline
+
+
+# (name, function, linear?) -- linear functions run on a sampled tail
+FUNCTIONS = [
+    ("first", ma.allocate_first_fit, True),
+    ("first_indexed", ma.allocate_first_fit_indexed, False),
+    ("best", ma.allocate_best_fit, True),
+    ("best_indexed", ma.allocate_best_fit_indexed, False),
+    ("worst", ma.allocate_worst_fit, True),
+    ("worst_indexed", ma.allocate_worst_fit_indexed, False),
+]
+
+
+# ---------------------------------------------------------------------------
+# Workload generators: each returns a list of n sizes.
+# ---------------------------------------------------------------------------
+
+def uniform_sizes(n, rng, max_size=1 << 20):
+    return [rng.randint(1, max_size) for _ in range(n)]
+
+
+def power_law_sizes(n, rng, alpha=1.5, min_size=16, max_size=1 << 20):
+    """Pareto(alpha) sizes: mostly small, with a heavy tail up to max_size."""
+    return [min(max_size, int(min_size * rng.paretovariate(alpha))) for _ in range(n)]
+
+
+def bimodal_sizes(n, rng, small=(16, 256), large=(4096, 65536), p_small=0.8):
+    """Many small objects mixed with a minority of large buffers."""
+    return [rng.randint(*small) if rng.random() < p_small else rng.randint(*large) for _ in range(n)]
+
+
+WORKLOADS = {
+    "uniform": uniform_sizes,
+    "power_law": power_law_sizes,
+    "bimodal": bimodal_sizes,
+}
+
+
+def make_workload(workload, blocks_count, processes_count, seed=0):
+    rng = random.Random(seed)
+    sizes = WORKLOADS[workload]
+    return sizes(blocks_count, rng), sizes(processes_count, rng)
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def bench_one(fn, blocks, processes, measure_memory=True):
+    start = time.perf_counter()
+    allocation = fn(blocks, processes)
+    seconds = time.perf_counter() - start
+    peak = None
+    if measure_memory:
+        # separate pass: tracemalloc slows allocation-heavy code down a lot
+        tracemalloc.start()
+        fn(blocks, processes)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return allocation, {
+        "processes": len(processes),
+        "seconds": round(seconds, 6),
+        "us_per_process": round(seconds / len(processes) * 1e6, 3) if processes else None,
+        "ops_per_sec": round(len(processes) / seconds) if seconds else None,
+        "peak_bytes": peak,
+    }
+
+
+def tail_workload(blocks, processes, allocation, tail):
+    """The last `tail` processes and the blocks as they stand once the
+    earlier processes are placed as in `allocation`: taken blocks become
+    size 0, which no process fits but the linear scans still walk past."""
+    cut = max(0, len(processes) - tail)
+    taken = set(allocation[:cut])
+    return [0 if i in taken else size for i, size in enumerate(blocks)], processes[cut:]
+
+
+def run_benchmarks(workloads, sizes, functions, linear_sample, seed=0, measure_memory=True):
+    """Yield one result dict per workload x size x function."""
+    selected = [f for f in FUNCTIONS if f[0] in functions]
+    indexed = {name.split("_")[0]: fn for name, fn, linear in FUNCTIONS if not linear}
+    for workload in workloads:
+        for size in sizes:
+            blocks, processes = make_workload(workload, size, size, seed)
+            sample = processes[:linear_sample]
+            for strategy in dict.fromkeys(name.split("_")[0] for name, _, _ in selected):
+                pair = [f for f in selected if f[0].split("_")[0] == strategy]
+                rows = {}
+                # the indexed run gives the heap state the linear timing starts from
+                if any(not linear for _, _, linear in pair):
+                    full, rows[False] = bench_one(indexed[strategy], blocks, processes, measure_memory)
+                else:
+                    full = indexed[strategy](blocks, processes)
+                for name, fn, linear in pair:
+                    if not linear:
+                        continue
+                    mismatch = f"{name}_indexed: result differs from allocate_{name}_fit on {workload}/{size}"
+                    if fn(blocks, sample) != full[:len(sample)]:
+                        raise SystemExit(mismatch)
+                    # time the last processes against the heap the earlier ones left
+                    # behind: on an empty heap linear first-fit stops after a few blocks
+                    rest, tail = tail_workload(blocks, processes, full, linear_sample)
+                    allocation, rows[True] = bench_one(fn, rest, tail, measure_memory)
+                    if allocation != full[len(processes) - len(tail):]:
+                        raise SystemExit(mismatch)
+                linear_us = rows.get(True, {}).get("us_per_process")
+                for name, _, linear in pair:
+                    result = rows[linear]
+                    us = result["us_per_process"]
+                    result["speedup"] = None
+                    if not linear and linear_us and us:
+                        result["speedup"] = round(linear_us / us, 1)
+                    yield dict(workload=workload, size=size, function=name, **result)
+
+
+def _key(result):
+    return f"{result['workload']}/{result['size']}/{result['function']}"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark memory_allocation.py allocators.")
+    parser.add_argument("--workload", "-w", nargs="+", default=list(WORKLOADS), choices=list(WORKLOADS))
+    parser.add_argument("--function", "-f", nargs="+", default=[f[0] for f in FUNCTIONS],
+                        choices=[f[0] for f in FUNCTIONS])
+    parser.add_argument("--sizes", "-s", type=int, nargs="+", default=[10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6],
+                        help="Blocks (and processes) per workload.")
+    parser.add_argument("--linear-sample", type=int, default=200,
+                        help="Processes given to the linear allocators (default: 200).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc peak-memory pass.")
+    parser.add_argument("--save-baseline", help="Write results to this JSON file.")
+    parser.add_argument("--baseline", help="Compare against a baseline JSON file.")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed throughput drop vs baseline before flagging (default: 0.25).")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    print(f"{'workload':10} {'size':>9} {'function':14} {'processes':>9} {'us/proc':>10} {'ops/s':>12} "
+          f"{'speedup':>8} {'peak':>12}")
+    results = []
+    for result in run_benchmarks(args.workload, args.sizes, args.function, args.linear_sample,
+                                 args.seed, not args.no_memory):
+        results.append(result)
+        peak, speedup = result["peak_bytes"], result["speedup"]
+        print(
+            f"{result['workload']:10} {result['size']:>9} {result['function']:14} {result['processes']:>9} "
+            f"{result['us_per_process'] or 0:>10.2f} {result['ops_per_sec'] or 0:>12,} "
+            f"{f'{speedup}x' if speedup is not None else '-':>8} {peak if peak is not None else '-':>12}",
+            flush=True,
+        )
+
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results, _key)
+        print(f"\nBaseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        print("\nPer-process throughput vs baseline:")
+        if compare(results, load_baseline(args.baseline), args.tolerance, _key, "ops_per_sec"):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
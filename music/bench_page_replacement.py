@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+bench_page_replacement.py
+Throughput benchmark for the simulators in page_replacement.py.
+
+Generates seeded synthetic traces (Zipf, looping, sequential scan and
+Markov locality), runs every selected policy over them in counts-only mode
+and reports references/second and peak traced memory per run. Results can
+be saved as a baseline JSON and compared against on later runs.
+
+Dependencies:
+    pip install numpy
+
+Examples:
+    python bench_page_replacement.py
+    python bench_page_replacement.py --sizes 1000 100000 10000000 --policy lru arc
+    python bench_page_replacement.py --save-baseline bench_baseline.json
+    python bench_page_replacement.py --baseline bench_baseline.json
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+
+try:
+    import numpy as np
+except Exception:
+    print("Missing dependency: numpy. Install with: pip install numpy")
+    sys.exit(1)
+
+import page_replacement
+from bench_common import compare, load_baseline, save_baseline
+
+
+# ---------------------------------------------------------------------------
+# Workload generators: each returns an int64 array of n page numbers.
+# ---------------------------------------------------------------------------
+
+def zipf_trace(n, pages=10000, alpha=1.0, seed=0):
+    """Independent references with Zipf(alpha) popularity over `pages` pages."""
+    rng = np.random.default_rng(seed)
+    weights = 1.0 / np.arange(1, pages + 1) ** alpha
+    ranks = rng.choice(pages, size=n, p=weights / weights.sum())
+    # spread the hot pages over the id space
+    return rng.permutation(pages)[ranks].astype(np.int64)
+
+
+def looping_trace(n, loop_len=100, seed=0):
+    """The same `loop_len` pages referenced cyclically (LRU's worst case)."""
+    offset = np.random.default_rng(seed).integers(0, 1 << 20)
+    return offset + np.arange(n, dtype=np.int64) % loop_len
+
+
+def scan_trace(n, pages=100000, run_length=64, seed=0):
+    """Sequential runs of `run_length` pages starting at random offsets."""
+    rng = np.random.default_rng(seed)
+    runs = -(-n // run_length)
+    starts = rng.integers(0, pages, size=runs)
+    return ((starts[:, None] + np.arange(run_length)) % pages).ravel()[:n].astype(np.int64)
+
+
+def markov_trace(n, pages=100000, locality=50, p_jump=0.001, seed=0):
+    """Markov locality model: references stay inside a window of `locality`
+    pages and move to a new random window with probability p_jump."""
+    rng = np.random.default_rng(seed)
+    phase = np.cumsum(rng.random(n) < p_jump)
+    bases = rng.integers(0, pages, size=int(phase[-1]) + 1 if n else 1)
+    return ((bases[phase] + rng.integers(0, locality, size=n)) % pages).astype(np.int64)
+
+
+WORKLOADS = {
+    "zipf": zipf_trace,
+    "loop": looping_trace,
+    "scan": scan_trace,
+    "markov": markov_trace,
+}
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def bench_one(policy, refs, frames_count, measure_memory=True):
+    start = time.perf_counter()
+    _, faults = page_replacement.simulate(policy, refs, frames_count, record=False)
+    seconds = time.perf_counter() - start
+    peak = None
+    if measure_memory:
+        # separate pass: tracemalloc slows allocation-heavy code down a lot
+        tracemalloc.start()
+        page_replacement.simulate(policy, refs, frames_count, record=False)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {
+        "seconds": round(seconds, 6),
+        "refs_per_sec": round(len(refs) / seconds) if seconds else None,
+        "peak_bytes": peak,
+        "faults": faults,
+    }
+
+
+def run_benchmarks(workloads, sizes, policies, frames_count, seed=0, measure_memory=True):
+    """Yield one result dict per workload x size x policy."""
+    for workload in workloads:
+        for size in sizes:
+            # simulators iterate Python ints, so convert once outside the timing
+            refs = WORKLOADS[workload](size, seed=seed).tolist()
+            for policy in policies:
+                result = {"workload": workload, "size": size, "policy": policy, "frames": frames_count}
+                result.update(bench_one(policy, refs, frames_count, measure_memory))
+                yield result
+
+
+def _key(result):
+    return f"{result['workload']}/{result['size']}/{result['policy']}/{result['frames']}"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark page_replacement.py simulators.")
+    parser.add_argument("--workload", "-w", nargs="+", default=list(WORKLOADS), choices=list(WORKLOADS))
+    parser.add_argument("--policy", "-p", nargs="+", default=list(page_replacement.POLICIES),
+                        choices=list(page_replacement.POLICIES))
+    parser.add_argument("--sizes", "-s", type=int, nargs="+", default=[10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6],
+                        help="Trace lengths (add 10000000 for the full 10^3..10^7 range).")
+    parser.add_argument("--frames", "-n", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc peak-memory pass.")
+    parser.add_argument("--save-baseline", help="Write results to this JSON file.")
+    parser.add_argument("--baseline", help="Compare against a baseline JSON file.")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed throughput drop vs baseline before flagging (default: 0.25).")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    print(f"{'workload':8} {'size':>9} {'policy':14} {'refs/s':>12} {'peak':>12} {'faults':>10}")
+    results = []
+    for result in run_benchmarks(args.workload, args.sizes, args.policy, args.frames,
+                                 args.seed, not args.no_memory):
+        results.append(result)
+        peak = result["peak_bytes"]
+        print(
+            f"{result['workload']:8} {result['size']:>9} {result['policy']:14} "
+            f"{result['refs_per_sec'] or 0:>12,} {peak if peak is not None else '-':>12} {result['faults']:>10}",
+            flush=True,
+        )
+
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results, _key)
+        print(f"\nBaseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        print("\nThroughput vs baseline:")
+        if compare(results, load_baseline(args.baseline), args.tolerance, _key, "refs_per_sec"):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,21 @@
 memory_allocation.py
 Simulates contiguous memory allocation strategies:
  - First-Fit | - Best-Fit | - Worst-Fit
+ - allocate_*_fit_indexed: the same strategies in O(log B) per process,
+   with identical output (see bench_memory_allocation.py)
+ - allocate_buddy / allocate_slab: binary buddy system and slab
+   (size-class) allocators with the same inputs; their results print
+   with print_allocation too
+ - simulate_heap: replays an allocate/free event trace against one
+   contiguous heap with first/best/worst/next-fit, splitting and
+   coalescing free regions, or with the buddy/slab allocators, and
+   tracks internal and external fragmentation over time; optional
+   compaction reports the bytes it had to move
+ - evaluate_strategies: Monte-Carlo fragmentation / failure-rate
+   statistics for first/best/worst-fit over many random workloads,
+   vectorized with NumPy across workloads
+ - write_allocation_report: the print_allocation table streamed to
+   CSV/NDJSON, plus a one-pass summary (or the summary alone)
 
 Inputs:
   - blocks: list of block sizes
@@ -11,8 +26,31 @@ Output:
   - Table of which process is allocated to which block
   - Internal fragmentation per allocation
   - Blocks left unallocated
+
+Usage:
+    python memory_allocation.py                  # fixed-block example
+    python memory_allocation.py heap events.txt --heap-size 1048576
+    python memory_allocation.py heap --events 1000000 --strategy first best
+    python memory_allocation.py heap --events 1000000 --compact
+    python memory_allocation.py batch --workloads 10000 --jobs 4   # needs numpy
+    python memory_allocation.py report --blocks 1000000 --out alloc.csv
+    python memory_allocation.py report --blocks 1000000 --summary-only
 """
 
+from bisect import bisect_left, insort
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import heapq
+import json
+import random
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:  # only the batch evaluator needs it
+    np = None
+
 def allocate_first_fit(blocks, processes):
     n = len(blocks)
     allocation = [-1] * len(processes)  # -1 means not allocated
@@ -43,6 +81,42 @@ def allocate_best_fit(blocks, processes):
             block_allocated[best_idx] = True
     return allocation
 
+def allocate_best_fit_indexed(blocks, processes):
+    # Same result as allocate_best_fit in O((B + P) log B).
+    # Blocks are sorted by (size, index) and a Fenwick tree over that order
+    # counts the ones still free. For each process, bisect finds the first
+    # block big enough and a tree descent finds the first free one from there.
+    n = len(blocks)
+    allocation = [-1] * len(processes)
+    order = sorted(range(n), key=blocks.__getitem__)  # stable: ties keep index order
+    sizes = [blocks[bi] for bi in order]
+    tree = [i & -i for i in range(n + 1)]  # Fenwick tree of an all-ones array
+    top = 1 << n.bit_length()
+    free = n
+    for pi, ps in enumerate(processes):
+        k = bisect_left(sizes, ps)
+        before = 0  # free blocks at sorted positions < k
+        i = k
+        while i > 0:
+            before += tree[i]
+            i -= i & -i
+        if before == free:
+            continue
+        # descend to the (before + 1)-th free position
+        pos, rank, step = 0, before + 1, top
+        while step:
+            if pos + step <= n and tree[pos + step] < rank:
+                pos += step
+                rank -= tree[pos]
+            step >>= 1
+        allocation[pi] = order[pos]
+        free -= 1
+        i = pos + 1
+        while i <= n:
+            tree[i] -= 1
+            i += i & -i
+    return allocation
+
 def allocate_worst_fit(blocks, processes):
     n = len(blocks)
     allocation = [-1] * len(processes)
@@ -59,6 +133,47 @@ def allocate_worst_fit(blocks, processes):
             block_allocated[worst_idx] = True
     return allocation
 
+def allocate_first_fit_indexed(blocks, processes):
+    # Same result as allocate_first_fit in O(B + P log B).
+    # Max segment tree over block capacities (allocated blocks hold -1):
+    # the leftmost block with size >= ps is found by walking down from the
+    # root, always taking the left child when it is big enough.
+    n = len(blocks)
+    allocation = [-1] * len(processes)
+    size = 1
+    while size < n:
+        size *= 2
+    tree = [-1] * (2 * size)
+    tree[size:size + n] = blocks
+    for i in range(size - 1, 0, -1):
+        tree[i] = max(tree[2 * i], tree[2 * i + 1])
+    for pi, ps in enumerate(processes):
+        if tree[1] < ps:
+            continue
+        i = 1
+        while i < size:
+            i = 2 * i if tree[2 * i] >= ps else 2 * i + 1
+        allocation[pi] = i - size
+        tree[i] = -1
+        i //= 2
+        while i:
+            tree[i] = max(tree[2 * i], tree[2 * i + 1])
+            i //= 2
+    return allocation
+
+def allocate_worst_fit_indexed(blocks, processes):
+    # Same result as allocate_worst_fit in O(B + P log B).
+    # Max-heap of (-size, index): the largest free block (lowest index on
+    # ties) is always on top, and only the top is ever allocated, so no
+    # stale entries can build up.
+    allocation = [-1] * len(processes)
+    heap = [(-bs, bi) for bi, bs in enumerate(blocks)]
+    heapq.heapify(heap)
+    for pi, ps in enumerate(processes):
+        if heap and -heap[0][0] >= ps:
+            allocation[pi] = heapq.heappop(heap)[1]
+    return allocation
+
 def print_allocation(blocks, processes, allocation):
     print("Process | Size | Block # | Block Size | Internal Fragmentation")
     print("-" * 60)
@@ -81,6 +196,820 @@ def print_allocation(blocks, processes, allocation):
     else:
         print("No free blocks left.")
 
+# ---------------------------------------------------------------------------
+# Buddy system and slab (size-class) allocators
+# ---------------------------------------------------------------------------
+
+class BuddyAllocator:
+    # Binary buddy system. Each chunk handed in is split into power-of-two
+    # top-level blocks (its binary digits, ignoring those below 2^min_order),
+    # laid out largest first so every block is aligned to its own size.
+    # Order k keeps a bitmap with one byte per 2^k-aligned slot (1 = free)
+    # and a stack of candidate addresses; stack entries are checked against
+    # the bitmap when popped, so merging a block away never searches the
+    # stack. alloc and free split/merge at most once per order: O(log N).
+    # The bitmaps take about 2 * total / 2^min_order bytes.
+
+    def __init__(self, chunks, min_order=0):
+        self.min_order = min_order
+        top = sorted((k for c in chunks for k in range(min_order, c.bit_length()) if c >> k & 1), reverse=True)
+        self.max_order = top[0] if top else min_order
+        self.total = sum(1 << k for k in top)
+        self.bitmaps = [bytearray((self.total >> k) + 1) for k in range(self.max_order + 1)]
+        self.stacks = [[] for _ in range(self.max_order + 1)]
+        self.counts = [0] * (self.max_order + 1)
+        self.top = {}        # address -> order of each top-level block (never merged past)
+        self.allocated = {}  # address -> order
+        self.free_bytes = 0
+        addr = 0
+        for k in top:
+            self.top[addr] = k
+            self._push(addr, k)
+            addr += 1 << k
+
+    def _push(self, addr, k):
+        stack = self.stacks[k]
+        if len(stack) > 4 * self.counts[k] + 64:  # drop stale and duplicate entries
+            bits = self.bitmaps[k]
+            stack[:] = dict.fromkeys(a for a in stack if bits[a >> k])
+        self.bitmaps[k][addr >> k] = 1
+        stack.append(addr)
+        self.counts[k] += 1
+        self.free_bytes += 1 << k
+
+    def _pop(self, k):
+        stack = self.stacks[k]
+        bits = self.bitmaps[k]
+        while True:
+            addr = stack.pop()
+            if bits[addr >> k]:
+                bits[addr >> k] = 0
+                self.counts[k] -= 1
+                self.free_bytes -= 1 << k
+                return addr
+
+    def order_for(self, size):
+        return max(self.min_order, (max(size, 1) - 1).bit_length())
+
+    def alloc(self, size):
+        # address of a 2^order block for `size` bytes, or -1
+        order = self.order_for(size)
+        k = order
+        while k <= self.max_order and not self.counts[k]:
+            k += 1
+        if k > self.max_order:
+            return -1
+        addr = self._pop(k)
+        while k > order:  # split, keeping the lower half
+            k -= 1
+            self._push(addr + (1 << k), k)
+        self.allocated[addr] = order
+        return addr
+
+    def free(self, addr):
+        k = self.allocated.pop(addr)
+        while self.top.get(addr) != k:
+            buddy = addr ^ (1 << k)
+            bits = self.bitmaps[k]
+            if not bits[buddy >> k]:
+                break
+            bits[buddy >> k] = 0  # its stack entry goes stale
+            self.counts[k] -= 1
+            self.free_bytes -= 1 << k
+            addr &= ~(1 << k)
+            k += 1
+        self._push(addr, k)
+
+    def largest_free(self):
+        for k in range(self.max_order, -1, -1):
+            if self.counts[k]:
+                return 1 << k
+        return 0
+
+    def free_blocks(self):
+        # (address, size) of every free block, by address
+        blocks = []
+        for k, stack in enumerate(self.stacks):
+            bits = self.bitmaps[k]
+            blocks.extend((a, 1 << k) for a in dict.fromkeys(stack) if bits[a >> k])
+        blocks.sort()
+        return blocks
+
+def default_size_classes(slab_size):
+    # 16, 24, 32, 48, 64, 96, ... up to half a slab
+    return sorted(c for k in range(4, slab_size.bit_length()) for c in (1 << k, 3 << (k - 1))
+                  if c <= slab_size // 2)
+
+class SlabAllocator:
+    # Size-class allocator on top of a BuddyAllocator. A request is rounded up
+    # to the smallest class that fits and served from a slab (one slab_size
+    # buddy block) holding objects of that class only; requests above the
+    # largest class go to the buddy allocator directly. A slab that empties is
+    # handed back to the buddy allocator. slab_size must be a power of two.
+
+    def __init__(self, buddy, slab_size=4096, classes=None):
+        if slab_size & (slab_size - 1):
+            raise ValueError("slab_size must be a power of two")
+        self.buddy = buddy
+        self.slab_size = slab_size
+        self.classes = sorted(classes) if classes else default_size_classes(slab_size)
+        if self.classes[-1] > slab_size:
+            raise ValueError("size classes must fit in one slab")
+        self.partial = [[] for _ in self.classes]  # per class: slabs that may have free objects
+        self.slabs = {}    # slab address -> [class index, free object addresses, live objects]
+        self.large = set()
+
+    def granted(self, size):
+        # bytes actually reserved for a `size`-byte request
+        ci = bisect_left(self.classes, size)
+        if ci < len(self.classes):
+            return self.classes[ci]
+        return 1 << self.buddy.order_for(size)
+
+    def alloc(self, size):
+        ci = bisect_left(self.classes, size)
+        if ci == len(self.classes):
+            addr = self.buddy.alloc(size)
+            if addr >= 0:
+                self.large.add(addr)
+            return addr
+        partial = self.partial[ci]
+        while partial and not partial[-1][1]:
+            partial.pop()  # full, or already handed back
+        if partial:
+            slab = partial[-1]
+        else:
+            base = self.buddy.alloc(self.slab_size)
+            if base < 0:
+                return -1
+            obj = self.classes[ci]
+            slab = [ci, list(range(base + (self.slab_size // obj - 1) * obj, base - 1, -obj)), 0]
+            self.slabs[base] = slab
+            partial.append(slab)
+        slab[2] += 1
+        return slab[1].pop()
+
+    def free(self, addr):
+        if addr in self.large:
+            self.large.discard(addr)
+            self.buddy.free(addr)
+            return
+        base = addr & ~(self.slab_size - 1)
+        slab = self.slabs[base]
+        if not slab[1]:
+            self.partial[slab[0]].append(slab)  # full -> partial again
+        slab[1].append(addr)
+        slab[2] -= 1
+        if not slab[2]:
+            del self.slabs[base]
+            slab[1] = []  # marks it dead for the partial stacks
+            self.buddy.free(base)
+
+    def idle_bytes(self):
+        # free object space sitting in partially used slabs
+        return sum(len(slab[1]) * self.classes[slab[0]] for slab in self.slabs.values())
+
+def allocate_buddy(blocks, processes, min_size=1):
+    # One-shot buddy allocation over `blocks`. Returns (carved, allocation):
+    # carved lists the power-of-two blocks handed out (allocation indexes into
+    # it) followed by the free buddy blocks left over, so
+    # print_allocation(carved, processes, allocation) prints the same table
+    # as for the fit strategies.
+    buddy = BuddyAllocator(blocks, (max(min_size, 1) - 1).bit_length())
+    allocation = [-1] * len(processes)
+    carved = []
+    for pi, ps in enumerate(processes):
+        addr = buddy.alloc(ps)
+        if addr >= 0:
+            allocation[pi] = len(carved)
+            carved.append(1 << buddy.allocated[addr])
+    carved.extend(size for _, size in buddy.free_blocks())
+    return carved, allocation
+
+def allocate_slab(blocks, processes, slab_size=4096, classes=None):
+    # One-shot slab allocation; same return shape as allocate_buddy, with
+    # carved holding the object (or large buddy block) size per process.
+    slab = SlabAllocator(BuddyAllocator(blocks), slab_size, classes)
+    allocation = [-1] * len(processes)
+    carved = []
+    for pi, ps in enumerate(processes):
+        if slab.alloc(ps) >= 0:
+            allocation[pi] = len(carved)
+            carved.append(slab.granted(ps))
+    carved.extend(size for _, size in slab.buddy.free_blocks())
+    return carved, allocation
+
+def fragmentation_report(blocks, processes, allocation):
+    # Internal: bytes granted beyond the request. External: how scattered
+    # the unallocated blocks are, 1 - largest free / total free.
+    internal = 0
+    placed = 0
+    used = set()
+    for ps, bidx in zip(processes, allocation):
+        if bidx != -1:
+            internal += blocks[bidx] - ps
+            placed += 1
+            used.add(bidx)
+    free = [bs for bi, bs in enumerate(blocks) if bi not in used]
+    total_free = sum(free)
+    return {
+        "processes": len(processes),
+        "placed": placed,
+        "failed": len(processes) - placed,
+        "internal": internal,
+        "free_blocks": len(free),
+        "free_total": total_free,
+        "largest_free": max(free, default=0),
+        "external": 1 - max(free, default=0) / total_free if total_free else 0.0,
+    }
+
+# ---------------------------------------------------------------------------
+# Monte-Carlo batch evaluation (NumPy)
+# ---------------------------------------------------------------------------
+
+BATCH_STRATEGIES = ("first", "best", "worst")
+
+def _require_numpy(what):
+    if np is None:
+        raise ImportError(f"{what} needs NumPy. Install with: pip install numpy")
+
+def random_workloads(count, blocks_count, processes_count, block_sizes=(100, 1000),
+                     process_sizes=(50, 800), seed=0):
+    # `count` independent workloads as (count, blocks_count) and
+    # (count, processes_count) int64 arrays; size ranges are inclusive.
+    _require_numpy("random_workloads")
+    rng = np.random.default_rng(seed)
+    blocks = rng.integers(block_sizes[0], block_sizes[1] + 1, size=(count, blocks_count))
+    processes = rng.integers(process_sizes[0], process_sizes[1] + 1, size=(count, processes_count))
+    return blocks, processes
+
+def allocate_batch(blocks, processes, strategy="first"):
+    # Runs one strategy on every row (workload) at once and returns a
+    # (count, processes_count) array of block indices, -1 = not allocated.
+    # Row by row it equals allocate_<strategy>_fit: the loop is over
+    # processes and each step is one argmax/argmin across all workloads.
+    _require_numpy("allocate_batch")
+    if strategy not in BATCH_STRATEGIES:
+        raise ValueError(f"unknown strategy {strategy!r} (choose from {', '.join(BATCH_STRATEGIES)})")
+    blocks = np.asarray(blocks, dtype=np.int64)
+    processes = np.asarray(processes, dtype=np.int64)
+    count = blocks.shape[0]
+    rows = np.arange(count)
+    remaining = blocks.copy()  # allocated blocks are set to -1
+    allocation = np.full(processes.shape, -1, dtype=np.int64)
+    missing = np.iinfo(np.int64).max
+    for pi in range(processes.shape[1]):
+        ps = processes[:, pi, None]
+        if strategy == "worst":
+            # the largest free block fits, or nothing does
+            idx = remaining.argmax(axis=1)
+            ok = remaining[rows, idx] >= ps[:, 0]
+        elif strategy == "best":
+            idx = np.where(remaining >= ps, remaining, missing).argmin(axis=1)
+            ok = remaining[rows, idx] >= ps[:, 0]
+        else:
+            fits = remaining >= ps
+            idx = fits.argmax(axis=1)  # first True
+            ok = fits[rows, idx]
+        allocation[ok, pi] = idx[ok]
+        remaining[rows[ok], idx[ok]] = -1
+    return allocation
+
+def batch_metrics(blocks, processes, allocation):
+    # Per-workload internal fragmentation (bytes) and failure rate.
+    _require_numpy("batch_metrics")
+    blocks = np.asarray(blocks)
+    placed = allocation >= 0
+    granted = np.take_along_axis(blocks, np.where(placed, allocation, 0), axis=1)
+    internal = np.where(placed, granted - processes, 0).sum(axis=1)
+    return internal, 1 - placed.mean(axis=1)
+
+def _evaluate_chunk(count, blocks_count, processes_count, block_sizes, process_sizes, seed, strategies):
+    blocks, processes = random_workloads(count, blocks_count, processes_count, block_sizes, process_sizes, seed)
+    return {strategy: batch_metrics(blocks, processes, allocate_batch(blocks, processes, strategy))
+            for strategy in strategies}
+
+def _distribution(values):
+    p50, p99 = np.percentile(values, [50, 99])
+    return {"mean": float(values.mean()), "p50": float(p50), "p99": float(p99)}
+
+def evaluate_strategies(count=1000, blocks_count=50, processes_count=50, block_sizes=(100, 1000),
+                        process_sizes=(50, 800), strategies=BATCH_STRATEGIES, seed=0, jobs=1,
+                        chunk_size=1000):
+    # Monte-Carlo comparison over `count` random workloads. Workloads are
+    # generated and evaluated in chunks of chunk_size (each with its own
+    # child seed, so results do not depend on `jobs`); jobs > 1 spreads the
+    # chunks over worker processes. Returns, per strategy, the mean / p50 /
+    # p99 of internal fragmentation and of the allocation failure rate.
+    _require_numpy("evaluate_strategies")
+    sizes = [min(chunk_size, count - start) for start in range(0, count, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs_args = [(n, blocks_count, processes_count, block_sizes, process_sizes, child, tuple(strategies))
+                 for n, child in zip(sizes, seeds)]
+    if jobs > 1 and len(jobs_args) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            chunks = list(pool.map(_evaluate_chunk, *zip(*jobs_args)))
+    else:
+        chunks = [_evaluate_chunk(*a) for a in jobs_args]
+    report = {}
+    for strategy in strategies:
+        internal = np.concatenate([c[strategy][0] for c in chunks])
+        failures = np.concatenate([c[strategy][1] for c in chunks])
+        report[strategy] = {
+            "workloads": int(internal.size),
+            "internal": _distribution(internal),
+            "failure_rate": _distribution(failures),
+        }
+    return report
+
+# ---------------------------------------------------------------------------
+# Dynamic heap: allocate/free events against one contiguous region
+# ---------------------------------------------------------------------------
+
+HEAP_STRATEGIES = ("first", "best", "worst", "next", "buddy", "slab")
+EVACUATION_TRIES = 8  # relocation plans compact_for checks before sliding instead
+
+def parse_heap_events(lines):
+    # One event per line: "a <id> <size>" allocates, "f <id>" frees.
+    # Blank lines and lines starting with '#' are skipped.
+    for lineno, line in enumerate(lines, 1):
+        parts = line.split()
+        if not parts or parts[0].startswith("#"):
+            continue
+        op = parts[0].lower()
+        if op in ("a", "alloc", "malloc") and len(parts) == 3:
+            yield "a", parts[1], int(parts[2])
+        elif op in ("f", "free") and len(parts) == 2:
+            yield "f", parts[1], 0
+        else:
+            raise ValueError(f"line {lineno}: expected 'a <id> <size>' or 'f <id>', got {line.strip()!r}")
+
+def random_heap_events(count, max_size=4096, free_prob=0.5, seed=0):
+    # Seeded random trace: allocations of 1..max_size bytes, each event a
+    # free of a random live allocation with probability free_prob.
+    rng = random.Random(seed)
+    live = []
+    for i in range(count):
+        if live and rng.random() < free_prob:
+            j = rng.randrange(len(live))
+            live[j], live[-1] = live[-1], live[j]
+            yield "f", live.pop(), 0
+        else:
+            live.append(i)
+            yield "a", i, rng.randint(1, max_size)
+
+def simulate_heap(events, heap_size, strategy="first", unit=1, sample_every=1000, slab_size=4096,
+                  compact=False):
+    # Free regions are kept in three structures:
+    #  - free_start {start: length} and free_end {end: start}, so a freed
+    #    region finds both neighbours in O(1) and coalesces with them;
+    #  - a max segment tree over addresses (in units) holding each free
+    #    region's length at its start address: first/next-fit walk down to
+    #    the lowest fitting address, worst-fit reads the largest at the root;
+    #  - for best-fit, a sorted list of length * units + start, so bisect
+    #    gives the smallest fitting region (lowest address on ties).
+    # Every operation is O(log U) tree work plus, for best-fit, a list insert.
+    # Sizes are rounded up to `unit` bytes; the tree holds 2 * heap_size / unit
+    # entries, so raise `unit` for very large heaps.
+    # "buddy" and "slab" replay the same events through BuddyAllocator /
+    # SlabAllocator instead (unit is then the smallest buddy block).
+    # With compact=True a request that fails while enough total space is
+    # free triggers compaction (fit strategies only, see compact_for below);
+    # the bytes copied are reported as bytes_moved. It also keeps an
+    # address-ordered index of the holes up to date on every event.
+    if strategy not in HEAP_STRATEGIES:
+        raise ValueError(f"unknown strategy {strategy!r} (choose from {', '.join(HEAP_STRATEGIES)})")
+    if strategy in ("buddy", "slab"):
+        return _simulate_buddy_heap(events, heap_size, strategy, unit, sample_every, slab_size)
+    units = heap_size // unit
+    if units < 1:
+        raise ValueError("heap_size must be at least one unit")
+    size = 1
+    while size < units:
+        size *= 2
+    tree = [0] * (2 * size)
+    i = size
+    while i:
+        tree[i] = units
+        i //= 2
+
+    # tree and size are bound as defaults so the hot loops read fast locals
+    def set_leaf(pos, value, tree=tree, size=size):
+        i = pos + size
+        tree[i] = value
+        while i > 1:
+            m = tree[i ^ 1]  # sibling
+            if value < m:
+                value = m
+            i >>= 1
+            if tree[i] == value:
+                break
+            tree[i] = value
+
+    def find(need, lo=0, tree=tree, size=size):
+        # lowest free-region start >= lo whose length is >= need, or -1
+        if lo:
+            i = lo + size
+            while tree[i] < need:
+                while i & 1:  # right child: climb until we can step right
+                    i //= 2
+                if i == 0:
+                    return -1
+                i += 1
+        elif tree[1] >= need:
+            i = 1
+        else:
+            return -1
+        while i < size:
+            i = 2 * i if tree[2 * i] >= need else 2 * i + 1
+        return i - size
+
+    def window_allocations(lo, hi):
+        # (start, length) of the allocations between holes[lo] and holes[hi]
+        found = []
+        for k in range(lo, hi):
+            st = holes[k] + free_start[holes[k]]
+            while st < holes[k + 1]:
+                ln = allocated[alloc_at[st]][1]
+                found.append((st, ln))
+                st += ln
+        return found
+
+    def evacuation(lo, hi, deficit, by_length):
+        # Greedy relocation of allocations between holes lo..hi into holes
+        # outside that window, largest first, each into the smallest spare
+        # hole that takes it. by_length is (length, start, index) of every
+        # hole, sorted. Returns [(start, length, target)] once at least
+        # `deficit` units would leave the window, or None.
+        spare = [(ln, h) for ln, h, k in by_length if k < lo or k > hi]
+        moves = []
+        for ln, st in sorted(((ln, st) for st, ln in window_allocations(lo, hi)), reverse=True):
+            j = bisect_left(spare, (ln, -1))
+            if j == len(spare):
+                continue
+            hole_len, hole = spare.pop(j)
+            if hole_len > ln:
+                insort(spare, (hole_len - ln, hole + ln))
+            moves.append((st, ln, hole))
+            deficit -= ln
+            if deficit <= 0:
+                return moves
+        return None
+
+    def take(st, ln):
+        # carve [st, st + ln) off the front of the free region at st
+        length = free_start.pop(st)
+        del free_end[st + length]
+        set_leaf(st, 0)
+        if by_size is not None:
+            del by_size[bisect_left(by_size, length * units + st)]
+        k = bisect_left(holes, st)
+        if length > ln:
+            rest = st + ln
+            free_start[rest] = length - ln
+            free_end[st + length] = rest
+            set_leaf(rest, length - ln)
+            if by_size is not None:
+                insort(by_size, (length - ln) * units + rest)
+            holes[k] = rest
+        else:
+            del holes[k]
+
+    def compact_for(need):
+        # Compaction plan for a request of `need` units when no hole fits.
+        # `holes` (free region starts in address order, kept up to date on
+        # every event) and alloc_at {start: id} form the interval index, so
+        # planning walks the H holes rather than every region. A plan picks
+        # a window from hole lo to hole hi; every allocation inside it moves,
+        # so its cost is the allocated units in the window. Allocations
+        # either slide to the window start or, when the window's holes alone
+        # are too small, are relocated into holes outside the window
+        # (greedy, see evacuation()); the window end becomes one free run.
+        # Two-pointer sweeps give the cheapest sliding window and, per start
+        # hole, the shortest window spanning `need`; up to EVACUATION_TRIES
+        # relocation candidates cheaper than the sliding plan are tried,
+        # cheapest first. Placement is greedy bin packing, so the plan is the
+        # cheapest one found among these windows, not a guaranteed minimum.
+        # Returns (start of the freed run, units moved).
+        n = len(holes)
+        lengths = [free_start[h] for h in holes]
+        best = None
+        lo = free_sum = 0
+        for hi in range(n):
+            free_sum += lengths[hi]
+            while free_sum - lengths[lo] >= need:
+                free_sum -= lengths[lo]
+                lo += 1
+            if free_sum >= need:
+                cost = holes[hi] + lengths[hi] - holes[lo] - free_sum
+                if best is None or cost < best[0]:
+                    best = (cost, lo, hi)
+        cost, lo, hi = best
+        moves = ()
+        prefix = [0]
+        for ln in lengths:
+            prefix.append(prefix[-1] + ln)
+        candidates = []
+        last = 0
+        for first in range(n):
+            last = max(last, first)
+            while last < n - 1 and holes[last] + lengths[last] - holes[first] < need:
+                last += 1
+            span = holes[last] + lengths[last] - holes[first]
+            window_free = prefix[last + 1] - prefix[first]
+            if span >= need > window_free and span - window_free < cost:
+                candidates.append((span - window_free, first, last, need - window_free))
+        if candidates:
+            by_length = sorted(zip(lengths, holes, range(n)))
+            candidates.sort()
+        for c_cost, c_lo, c_hi, deficit in candidates[:EVACUATION_TRIES]:
+            plan = evacuation(c_lo, c_hi, deficit, by_length)
+            if plan is not None:
+                cost, lo, hi, moves = c_cost, c_lo, c_hi, plan
+                break
+
+        pos = holes[lo]
+        end = holes[hi] + lengths[hi]
+        inside = window_allocations(lo, hi)
+        for k in range(lo, hi + 1):
+            h, ln = holes[k], lengths[k]
+            del free_start[h]
+            del free_end[h + ln]
+            set_leaf(h, 0)
+            if by_size is not None:
+                del by_size[bisect_left(by_size, ln * units + h)]
+        del holes[lo:hi + 1]
+        relocated = set()
+        for st, ln, target in moves:
+            take(target, ln)
+            ident = alloc_at.pop(st)
+            allocated[ident] = (target, ln, allocated[ident][2])
+            alloc_at[target] = ident
+            relocated.add(st)
+        for st, ln in inside:
+            if st not in relocated:
+                ident = alloc_at.pop(st)
+                allocated[ident] = (pos, ln, allocated[ident][2])
+                alloc_at[pos] = ident
+                pos += ln
+        # neighbours of the window are allocated, so the run merges with nothing
+        free_start[pos] = end - pos
+        free_end[end] = pos
+        set_leaf(pos, end - pos)
+        if by_size is not None:
+            insort(by_size, (end - pos) * units + pos)
+        insort(holes, pos)
+        return pos, cost
+
+    free_start = {0: units}
+    free_end = {units: 0}
+    by_size = [units * units] if strategy == "best" else None
+    holes = [0] if compact else None  # interval index, only kept for compaction
+    alloc_at = {}
+    allocated = {}
+    total_free = units
+    cursor = 0
+    allocs = frees = failures = 0
+    peak_used = 0
+    internal = 0  # rounding waste of the live allocations
+    compactions = moved = 0
+    samples = []
+
+    n = 0  # events replayed, frees of failed allocations included
+    for n, (op, ident, nbytes) in enumerate(events, 1):
+        if op == "a":
+            need = max(1, -(-nbytes // unit))
+            if strategy == "first":
+                s = find(need)
+            elif strategy == "best":
+                k = bisect_left(by_size, need * units)
+                s = by_size[k] % units if k < len(by_size) else -1
+            elif strategy == "worst":
+                s = find(tree[1]) if tree[1] >= need else -1
+            else:
+                s = find(need, cursor) if cursor < units else -1
+                if s < 0 and cursor:
+                    s = find(need)
+            if s < 0 and compact and total_free >= need:
+                s, cost = compact_for(need)
+                compactions += 1
+                moved += cost
+            if s < 0:
+                failures += 1
+                allocated[ident] = None  # a later free of it is a no-op, like free(NULL)
+            else:
+                length = free_start.pop(s)
+                del free_end[s + length]
+                if by_size is not None:
+                    del by_size[bisect_left(by_size, length * units + s)]
+                rest = length - need
+                if rest:
+                    free_start[s + need] = rest
+                    free_end[s + length] = s + need
+                    set_leaf(s + need, rest)
+                    if by_size is not None:
+                        insort(by_size, rest * units + s + need)
+                set_leaf(s, 0)
+                if holes is not None:
+                    k = bisect_left(holes, s)
+                    if rest:
+                        holes[k] = s + need
+                    else:
+                        del holes[k]
+                    alloc_at[s] = ident
+                allocated[ident] = (s, need, nbytes)
+                internal += need * unit - nbytes
+                total_free -= need
+                cursor = s + need
+                allocs += 1
+                if units - total_free > peak_used:
+                    peak_used = units - total_free
+        else:
+            try:
+                block = allocated.pop(ident)
+            except KeyError:
+                raise ValueError(f"event {n}: free of unknown id {ident!r}") from None
+            if block is not None:
+                s, length, nbytes = block
+                if holes is not None:
+                    del alloc_at[s]
+                internal -= length * unit - nbytes
+                total_free += length
+                frees += 1
+                end = s + length
+                nxt = free_start.pop(end, None)
+                if nxt is not None:  # merge with the region after
+                    del free_end[end + nxt]
+                    set_leaf(end, 0)
+                    if by_size is not None:
+                        del by_size[bisect_left(by_size, nxt * units + end)]
+                    length += nxt
+                prev = free_end.pop(s, None)
+                if prev is not None:  # merge with the region before
+                    plen = free_start.pop(prev)
+                    if by_size is not None:
+                        del by_size[bisect_left(by_size, plen * units + prev)]
+                    s = prev
+                    length += plen
+                free_start[s] = length
+                free_end[s + length] = s
+                set_leaf(s, length)
+                if by_size is not None:
+                    insort(by_size, length * units + s)
+                if holes is not None:
+                    if prev is not None:  # already listed under prev
+                        if nxt is not None:
+                            del holes[bisect_left(holes, end)]
+                    elif nxt is not None:
+                        holes[bisect_left(holes, end)] = s
+                    else:
+                        insort(holes, s)
+        if sample_every and n % sample_every == 0:
+            samples.append((n, 1 - tree[1] / total_free if total_free else 0.0))
+
+    fragmentation = 1 - tree[1] / total_free if total_free else 0.0
+    return {
+        "strategy": strategy,
+        "events": n,
+        "allocs": allocs,
+        "frees": frees,
+        "failures": failures,
+        "used": (units - total_free) * unit,
+        "peak_used": peak_used * unit,
+        "free_regions": len(free_start),
+        "largest_free": tree[1] * unit,
+        "internal": internal,
+        "compactions": compactions,
+        "bytes_moved": moved * unit,
+        "fragmentation": fragmentation,  # 1 - largest free region / total free
+        "samples": samples,              # (event number, fragmentation)
+    }
+
+def _simulate_buddy_heap(events, heap_size, strategy, unit, sample_every, slab_size):
+    # simulate_heap for the buddy and slab allocators; same result keys.
+    # Only the power-of-two part of heap_size is usable by a single buddy
+    # tree, so the heap is managed as its binary digits (see BuddyAllocator).
+    buddy = BuddyAllocator([heap_size], (max(unit, 1) - 1).bit_length())
+    allocator = SlabAllocator(buddy, slab_size) if strategy == "slab" else buddy
+    granted = allocator.granted if strategy == "slab" else (lambda size: 1 << buddy.order_for(size))
+    allocated = {}
+    allocs = frees = failures = 0
+    peak_used = 0
+    internal = 0
+    samples = []
+
+    n = 0  # events replayed, frees of failed allocations included
+    for n, (op, ident, nbytes) in enumerate(events, 1):
+        if op == "a":
+            addr = allocator.alloc(nbytes)
+            if addr < 0:
+                failures += 1
+                allocated[ident] = None
+            else:
+                waste = granted(nbytes) - nbytes
+                allocated[ident] = (addr, waste)
+                internal += waste
+                allocs += 1
+                used = buddy.total - buddy.free_bytes
+                if used > peak_used:
+                    peak_used = used
+        else:
+            try:
+                block = allocated.pop(ident)
+            except KeyError:
+                raise ValueError(f"event {n}: free of unknown id {ident!r}") from None
+            if block is not None:
+                allocator.free(block[0])
+                internal -= block[1]
+                frees += 1
+        if sample_every and n % sample_every == 0:
+            free = buddy.free_bytes
+            samples.append((n, 1 - buddy.largest_free() / free if free else 0.0))
+
+    free = buddy.free_bytes
+    result = {
+        "strategy": strategy,
+        "events": n,
+        "allocs": allocs,
+        "frees": frees,
+        "failures": failures,
+        "used": buddy.total - free,
+        "peak_used": peak_used,
+        "free_regions": sum(buddy.counts),
+        "largest_free": buddy.largest_free(),
+        "internal": internal,
+        "compactions": 0,
+        "bytes_moved": 0,
+        "fragmentation": 1 - buddy.largest_free() / free if free else 0.0,
+        "samples": samples,
+    }
+    if strategy == "slab":
+        result["slab_idle"] = allocator.idle_bytes()
+    return result
+
+def print_heap_result(result, seconds=None):
+    samples = [f for _, f in result["samples"]]
+    mean = sum(samples) / len(samples) if samples else result["fragmentation"]
+    rate = f"{result['events'] / seconds:12,.0f}" if seconds else f"{'-':>12}"
+    requests = result["allocs"] + result["failures"]
+    success = result["allocs"] / requests if requests else 1.0
+    print(f"{result['strategy']:8} | {result['allocs']:9} | {result['failures']:8} | {success:7.2%} | "
+          f"{result['bytes_moved']:12} | {result['peak_used']:12} | {result['internal']:10} | "
+          f"{result['free_regions']:7} | {result['fragmentation']:10.3f} | {mean:9.3f} | {rate}")
+
+REPORT_FORMATS = ("csv", "ndjson")
+
+def allocation_summary(blocks, processes, allocation):
+    # fragmentation_report in one vectorized pass (falls back to it
+    # without NumPy); cheap enough for millions of processes.
+    if np is None:
+        return fragmentation_report(blocks, processes, allocation)
+    blocks = np.asarray(blocks, dtype=np.int64)
+    processes = np.asarray(processes, dtype=np.int64)
+    allocation = np.asarray(allocation, dtype=np.int64)
+    placed = allocation >= 0
+    chosen = allocation[placed]
+    used = np.zeros(blocks.size, dtype=bool)
+    used[chosen] = True
+    free = blocks[~used]
+    total_free = int(free.sum())
+    largest = int(free.max()) if free.size else 0
+    return {
+        "processes": int(processes.size),
+        "placed": int(chosen.size),
+        "failed": int(processes.size - chosen.size),
+        "internal": int((blocks[chosen] - processes[placed]).sum()),
+        "free_blocks": int(free.size),
+        "free_total": total_free,
+        "largest_free": largest,
+        "external": 1 - largest / total_free if total_free else 0.0,
+    }
+
+def write_allocation_report(blocks, processes, allocation, out, fmt="csv", summary_only=False,
+                            chunk_rows=65536):
+    # Streams the print_allocation table to `out` as CSV or NDJSON, one
+    # write per chunk_rows rows, and returns allocation_summary(). With
+    # summary_only the rows are skipped and only the summary is computed.
+    if fmt == "csv":
+        header = "process,size,block,block_size,fragmentation\n"
+        row = "{},{},{},{},{}\n".format
+        missing = ""
+    elif fmt == "ndjson":
+        header = ""
+        row = '{{"process": {}, "size": {}, "block": {}, "block_size": {}, "fragmentation": {}}}\n'.format
+        missing = "null"
+    else:
+        raise ValueError(f"unknown report format {fmt!r} (choose from {', '.join(REPORT_FORMATS)})")
+    if not summary_only:
+        out.write(header)
+        for lo in range(0, len(processes), chunk_rows):
+            hi = min(lo + chunk_rows, len(processes))
+            out.write("".join(
+                row(pi, ps, missing, missing, missing) if bi == -1 else row(pi, ps, bi, blocks[bi], blocks[bi] - ps)
+                for pi, ps, bi in zip(range(lo, hi), processes[lo:hi], allocation[lo:hi])
+            ))
+    return allocation_summary(blocks, processes, allocation)
+
 def run_example():
     
     # Make changes as per your requirement
@@ -98,6 +1027,99 @@ def run_example():
     print("\n--- Worst-Fit ---")
     alloc_wf = allocate_worst_fit(blocks, processes)
     print_allocation(blocks, processes, alloc_wf)
+    print("\n--- Buddy ---")
+    carved, alloc_bd = allocate_buddy(blocks, processes)
+    print_allocation(carved, processes, alloc_bd)
+    print("\n--- Slab (256-byte slabs) ---")
+    carved, alloc_sl = allocate_slab(blocks, processes, slab_size=256)
+    print_allocation(carved, processes, alloc_sl)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Memory allocation simulator. Run without arguments for the fixed-block example.")
+    sub = parser.add_subparsers(dest="command")
+    heap = sub.add_parser("heap", help="Replay an allocate/free event trace against a contiguous heap.")
+    heap.add_argument("trace", nargs="?",
+                      help="Event file, one 'a <id> <size>' or 'f <id>' per line (default: random trace).")
+    heap.add_argument("--heap-size", type=int, default=1 << 20, help="Heap size in bytes (default: 1 MiB).")
+    heap.add_argument("--strategy", "-s", nargs="+", default=list(HEAP_STRATEGIES), choices=HEAP_STRATEGIES)
+    heap.add_argument("--unit", type=int, default=1, help="Allocation granularity in bytes (default: 1).")
+    heap.add_argument("--slab-size", type=int, default=4096, help="Slab size for --strategy slab (default: 4096).")
+    heap.add_argument("--compact", action="store_true",
+                      help="Compact the heap when a request fails but enough space is free (fit strategies).")
+    heap.add_argument("--sample-every", type=int, default=1000,
+                      help="Record fragmentation every N events (default: 1000).")
+    heap.add_argument("--events", type=int, default=100000, help="Random trace length (default: 100000).")
+    heap.add_argument("--max-size", type=int, default=4096, help="Random trace: largest request (default: 4096).")
+    heap.add_argument("--seed", type=int, default=0)
+
+    batch = sub.add_parser("batch", help="Fragmentation statistics over many random workloads (needs numpy).")
+    batch.add_argument("--workloads", "-w", type=int, default=10000)
+    batch.add_argument("--blocks", "-b", type=int, default=50, help="Blocks per workload (default: 50).")
+    batch.add_argument("--processes", "-p", type=int, default=50, help="Processes per workload (default: 50).")
+    batch.add_argument("--block-sizes", type=int, nargs=2, default=[100, 1000], metavar=("MIN", "MAX"))
+    batch.add_argument("--process-sizes", type=int, nargs=2, default=[50, 800], metavar=("MIN", "MAX"))
+    batch.add_argument("--strategy", "-s", nargs="+", default=list(BATCH_STRATEGIES), choices=BATCH_STRATEGIES)
+    batch.add_argument("--jobs", "-j", type=int, default=1, help="Worker processes (default: 1).")
+    batch.add_argument("--chunk-size", type=int, default=1000, help="Workloads per chunk (default: 1000).")
+    batch.add_argument("--seed", type=int, default=0)
+
+    report = sub.add_parser("report", help="Allocate a random workload and stream the table to CSV/NDJSON.")
+    report.add_argument("--blocks", "-b", type=int, default=100000, help="Number of blocks (default: 100000).")
+    report.add_argument("--processes", "-p", type=int, help="Number of processes (default: same as blocks).")
+    report.add_argument("--strategy", "-s", default="first", choices=BATCH_STRATEGIES)
+    report.add_argument("--format", "-f", default="csv", choices=REPORT_FORMATS)
+    report.add_argument("--out", "-o", help="Output file (default: stdout).")
+    report.add_argument("--summary-only", action="store_true", help="Skip the per-process rows.")
+    report.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command is None:
+        run_example()
+        return
+    if args.command == "heap":
+        if args.trace:
+            with open(args.trace, "r", encoding="utf-8") as handle:
+                events = list(parse_heap_events(handle))
+        else:
+            events = list(random_heap_events(args.events, args.max_size, seed=args.seed))
+        print("Strategy |    Allocs | Failures | Success |  Bytes moved |    Peak used |   Internal | Regions |"
+              " Final frag | Mean frag |     Events/s")
+        print("-" * 135)
+        for strategy in args.strategy:
+            start = time.perf_counter()
+            result = simulate_heap(events, args.heap_size, strategy, args.unit, args.sample_every,
+                                   args.slab_size, args.compact)
+            print_heap_result(result, time.perf_counter() - start)
+    if args.command == "report":
+        rng = random.Random(args.seed)
+        blocks = [rng.randint(100, 1000) for _ in range(args.blocks)]
+        processes = [rng.randint(50, 800) for _ in range(args.processes or args.blocks)]
+        allocate = {"first": allocate_first_fit_indexed, "best": allocate_best_fit_indexed,
+                    "worst": allocate_worst_fit_indexed}[args.strategy]
+        allocation = allocate(blocks, processes)
+        out = open(args.out, "w", newline="") if args.out else sys.stdout
+        try:
+            summary = write_allocation_report(blocks, processes, allocation, out, args.format, args.summary_only)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        # keep stdout clean when the rows go there
+        print(json.dumps(summary), file=sys.stderr if out is sys.stdout and not args.summary_only else sys.stdout)
+    if args.command == "batch":
+        start = time.perf_counter()
+        report = evaluate_strategies(args.workloads, args.blocks, args.processes, tuple(args.block_sizes),
+                                     tuple(args.process_sizes), args.strategy, args.seed, args.jobs,
+                                     args.chunk_size)
+        print(f"{args.workloads} workloads in {time.perf_counter() - start:.2f}s")
+        print("Strategy | Internal mean |   p50 |   p99 | Failure mean |   p50 |   p99")
+        print("-" * 74)
+        for strategy, stats in report.items():
+            internal, failures = stats["internal"], stats["failure_rate"]
+            print(f"{strategy:8} | {internal['mean']:13.1f} | {internal['p50']:5.0f} | {internal['p99']:5.0f} | "
+                  f"{failures['mean']:12.3f} | {failures['p50']:5.3f} | {failures['p99']:5.3f}")
 
 if __name__ == "__main__":
-    run_example()
+    main()
@@ -2,22 +2,63 @@
 """
 page_replacement.py
 Simulates and visualizes page replacement algorithms: FIFO, LRU, Optimal.
+Clock, Second-Chance, LFU, ARC and 2Q are also available through simulate()
+and the POLICIES registry.
 
 Usage:
   - Run the script and follow prompts.
   - Or modify the example usage at bottom.
+  - Or simulate a trace file non-interactively (results as JSON lines):
+      python page_replacement.py run trace.txt --frames 64 256 --policy lru fifo
+      python page_replacement.py run trace.bin --format int64 --mmap --frames 4096
+  - Or render / export a window of one run's timeline:
+      python page_replacement.py timeline trace.txt --frames 64 --steps 5000:5100
+      python page_replacement.py timeline trace.txt --frames 64 --export ndjson > steps.ndjson
+  - Or turn a raw address trace (valgrind --tool=lackey --trace-mem=yes)
+    into a page trace, collapsing back-to-back references to one page:
+      python page_replacement.py convert lackey.out pages.bin --page-size 4096
+      python page_replacement.py run pages.bin --format int64 --frames 256
+  - Or profile where simulator time goes (JSON, optional pstats file):
+      python page_replacement.py profile trace.txt --frames 64 --pstats phases.prof
+  - Or sweep traces x policies x frame counts across all cores:
+      python page_replacement.py sweep a.txt b.txt --frames 64 128 256 --out results.csv
 
 Outputs a step-by-step memory table and a colored console visualization:
   - Green = Hit
   - Red = Page fault (inserted)
   - Yellow = The frame that was replaced
 
-Note: ANSI color codes are used for terminal visualization.
+Each simulator returns (timeline, faults). The timeline is a compact
+Timeline object; pass record=False to skip it and only count faults.
+
+Note: ANSI color codes are used for terminal visualization; they are
+switched off automatically when output is not a terminal.
 """
 
-from collections import deque
+from array import array
+from collections import OrderedDict, deque
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import islice
+from operator import itemgetter
+import argparse
 import copy
+import csv
+import hashlib
+import heapq
+import json
+import marshal
 import math
+import mmap
+import os
+import sys
+import tempfile
+import time
+
+try:
+    import numpy as np
+except ImportError:  # only the batch and address-trace helpers need NumPy
+    np = None
 
 # ANSI color codes for terminal highlighting (works on most UNIX terminals)
 CLR_RESET = "\033[0m"
@@ -26,114 +67,1355 @@ CLR_RED = "\033[91m"
 CLR_YELLOW = "\033[93m"
 CLR_BOLD = "\033[1m"
 
-def simulate_fifo(refs, frames_count):
-    frames = [-1] * frames_count
-    q = deque()
-    timeline = []  # list of dicts: {'page':p, 'frames':[], 'fault':bool, 'replaced_index':int or None}
-    for i, p in enumerate(refs):
-        if p in frames:
-            timeline.append({'page': p, 'frames': frames.copy(), 'fault': False, 'replaced_index': None})
+class Timeline:
+    """Compact step-by-step record of one simulation run.
+
+    Only the per-step delta is stored: the referenced page and the frame it
+    was written to (-1 for a hit), both in typed arrays. Pages that are not
+    64-bit integers (string labels, say) switch the page record and later
+    checkpoints to plain lists, which costs more memory. Frame contents are
+    rebuilt on demand from periodic checkpoints, so memory is O(N) machine
+    words instead of O(N * frames) Python objects.
+
+    Indexing or iterating yields the same dicts the simulators used to
+    return: {'page', 'frames', 'fault', 'replaced_index'}.
+    """
+
+    def __init__(self, frames_count):
+        self.frames_count = frames_count
+        self.pages = array('q')
+        self.replaced = array('i')  # frame index written at each step, -1 = hit
+        self.faults = 0
+        # frame contents before step k * interval, for random access
+        self._interval = max(1024, 4 * frames_count)
+        self._checkpoints = []
+        self._frames = [-1] * frames_count
+
+    def append(self, page, replaced_index):
+        if len(self.pages) % self._interval == 0:
+            frames = self._frames
+            self._checkpoints.append(frames.copy() if isinstance(self.pages, list) else array('q', frames))
+        try:
+            self.pages.append(page)
+        except (TypeError, OverflowError):
+            self.pages = list(self.pages)
+            self.pages.append(page)
+        if replaced_index is None:
+            self.replaced.append(-1)
+        else:
+            self.replaced.append(replaced_index)
+            self._frames[replaced_index] = page
+            self.faults += 1
+
+    def __len__(self):
+        return len(self.pages)
+
+    def frames_at(self, step):
+        """Frame contents right after `step`, replayed from the nearest checkpoint."""
+        block = step // self._interval
+        frames = list(self._checkpoints[block])
+        pages, replaced = self.pages, self.replaced
+        for i in range(block * self._interval, step + 1):
+            ridx = replaced[i]
+            if ridx != -1:
+                frames[ridx] = pages[i]
+        return frames
+
+    def _entry(self, step, frames):
+        ridx = self.replaced[step]
+        return {'page': self.pages[step], 'frames': frames,
+                'fault': ridx != -1, 'replaced_index': ridx if ridx != -1 else None}
+
+    def __getitem__(self, step):
+        if isinstance(step, slice):
+            return [self[i] for i in range(*step.indices(len(self)))]
+        if step < 0:
+            step += len(self)
+        if not 0 <= step < len(self):
+            raise IndexError("timeline index out of range")
+        return self._entry(step, self.frames_at(step))
+
+    def __iter__(self):
+        for step, _, frames, _ in self.steps():
+            yield self._entry(step, frames.copy())
+
+    def steps(self, start=0, stop=None):
+        """Yield (step, page, frames, replaced_index) for start <= step < stop,
+        with replaced_index -1 for a hit. Replay starts at the checkpoint
+        before `start`. `frames` is one list updated in place, so copy it
+        to keep a snapshot."""
+        start, stop, _ = slice(start, stop).indices(len(self.pages))
+        if start >= stop:
+            return
+        block = start // self._interval
+        frames = list(self._checkpoints[block])
+        pages, replaced = self.pages, self.replaced
+        for step in range(block * self._interval, start):
+            ridx = replaced[step]
+            if ridx != -1:
+                frames[ridx] = pages[step]
+        for step in range(start, stop):
+            ridx = replaced[step]
+            if ridx != -1:
+                frames[ridx] = pages[step]
+            yield step, pages[step], frames, ridx
+
+def next_use_indices(refs):
+    """Return an array where entry i is the index of the next reference to
+    refs[i] after position i, or len(refs) if the page is never used again.
+    Built with a single backward pass."""
+    n = len(refs)
+    next_use = array('q', [n]) * n
+    seen = {}
+    for i in range(n - 1, -1, -1):
+        p = refs[i]
+        next_use[i] = seen.get(p, n)
+        seen[p] = i
+    return next_use
+
+def _as_sequence(refs):
+    # OPT and the curve builders need random access / len(); materialize
+    # one-shot iterables (generators, file streams) into a list.
+    return refs if isinstance(refs, Sequence) else list(refs)
+
+# ---------------------------------------------------------------------------
+# Replacement policies
+# ---------------------------------------------------------------------------
+
+POLICIES = {}  # name -> ReplacementPolicy subclass
+
+def register_policy(name):
+    """Class decorator that adds a ReplacementPolicy subclass to POLICIES."""
+    def decorator(cls):
+        cls.name = name
+        POLICIES[name] = cls
+        return cls
+    return decorator
+
+class ReplacementPolicy:
+    """Frame bookkeeping shared by every policy.
+
+    `resident` maps page -> frame index. Free frames are filled left to
+    right, and once memory is full every fault evicts exactly one page.
+    Subclasses only decide what to evict, through three hooks:
+
+      on_hit(page, frame)    a resident page was referenced
+      evict(page)            return the resident page to evict for a fault on `page`
+      on_admit(page, frame)  `page` was just loaded into `frame`
+    """
+
+    name = None
+    needs_future = False  # True if the policy reads ahead in the trace (OPT)
+
+    def __init__(self, frames_count, refs=None):
+        self.frames_count = frames_count
+        self.resident = {}
+
+    def access(self, page):
+        """Reference `page`. Returns None on a hit, otherwise the frame it was loaded into."""
+        frame = self.resident.get(page)
+        if frame is not None:
+            self.on_hit(page, frame)
+            return None
+        if len(self.resident) < self.frames_count:
+            frame = len(self.resident)
+        else:
+            frame = self.resident.pop(self.evict(page))
+        self.resident[page] = frame
+        self.on_admit(page, frame)
+        return frame
+
+    def on_hit(self, page, frame):
+        pass
+
+    def evict(self, page):
+        raise NotImplementedError
+
+    def on_admit(self, page, frame):
+        pass
+
+@register_policy('fifo')
+class FIFO(ReplacementPolicy):
+    def __init__(self, frames_count, refs=None):
+        super().__init__(frames_count)
+        self.queue = deque()
+
+    def evict(self, page):
+        return self.queue.popleft()
+
+    def on_admit(self, page, frame):
+        self.queue.append(page)
+
+@register_policy('lru')
+class LRU(ReplacementPolicy):
+    # `resident` is kept in recency order (least recently used first).
+    # OrderedDict is a hash map over a doubly linked list, so a hit
+    # (move_to_end) and an eviction (first key) are both O(1).
+    def __init__(self, frames_count, refs=None):
+        super().__init__(frames_count)
+        self.resident = OrderedDict()
+
+    def on_hit(self, page, frame):
+        self.resident.move_to_end(page)
+
+    def evict(self, page):
+        return next(iter(self.resident))
+
+@register_policy('optimal')
+class Optimal(ReplacementPolicy):
+    """Belady's OPT: evict the page whose next use is furthest in the future.
+
+    Resident pages sit in a max-heap on next use as (-next_use, frame, page)
+    with stale entries skipped lazily, so each step is O(log F). Ties (pages
+    never used again) go to the lowest frame index.
+    """
+
+    needs_future = True
+
+    def __init__(self, frames_count, refs=None):
+        super().__init__(frames_count)
+        self.next_use = next_use_indices(refs)
+        self.t = 0  # position in refs
+        self.upcoming = {}  # page -> index of its next use (the live heap key)
+        self.heap = []
+
+    def access(self, page):
+        frame = super().access(page)
+        self.t += 1
+        return frame
+
+    def on_hit(self, page, frame):
+        self._schedule(page, frame, self.next_use[self.t])
+
+    def on_admit(self, page, frame):
+        self._schedule(page, frame, self.next_use[self.t])
+
+    def _schedule(self, page, frame, nxt):
+        self.upcoming[page] = nxt
+        heapq.heappush(self.heap, (-nxt, frame, page))
+        if len(self.heap) > 4 * self.frames_count + 64:
+            # drop stale entries so the heap stays O(frames)
+            self.heap = [(-self.upcoming[pg], fi, pg) for pg, fi in self.resident.items()]
+            heapq.heapify(self.heap)
+
+    def evict(self, page):
+        heap, resident, upcoming = self.heap, self.resident, self.upcoming
+        while True:
+            neg_nxt, frame, victim = heapq.heappop(heap)
+            if resident.get(victim) == frame and upcoming[victim] == -neg_nxt:
+                del upcoming[victim]
+                return victim
+
+    def _search_start(self):
+        return len(self.heap)
+
+    def _search_skipped(self, start):
+        return start - len(self.heap) - 1  # stale entries popped before the victim
+
+_PENDING = object()  # outcome not decided yet (still inside the lookahead window)
+
+class LookaheadOptimal(Optimal):
+    """OPT for a live stream that can only see the next `lookahead` references.
+
+    push(page) adds a reference to the window and, once the window is full,
+    processes the oldest one. Next uses come from per-page queues of the
+    positions still in the window; a page with none counts as never used
+    again. With a window covering the whole trace the result equals
+    simulate_optimal.
+    """
+
+    needs_future = False
+
+    def __init__(self, frames_count, refs=None, lookahead=1024):
+        ReplacementPolicy.__init__(self, frames_count)
+        self.lookahead = lookahead
+        self.upcoming = {}
+        self.heap = []
+        self.window = deque()
+        self.pending = {}  # page -> deque of its positions in the window
+        self.pushed = 0
+
+    access = ReplacementPolicy.access
+
+    def push(self, page):
+        """Returns the outcome of the reference leaving the window (None for a
+        hit, else the frame loaded), or _PENDING while the window fills."""
+        pos = self.pushed
+        self.pushed += 1
+        self.window.append(page)
+        positions = self.pending.get(page)
+        if positions is None:
+            positions = self.pending[page] = deque()
+        positions.append(pos)
+        if page in self.resident and self.upcoming[page] == math.inf:
+            self._schedule(page, self.resident[page], pos)
+        if len(self.window) > self.lookahead:
+            return self.access(self.window.popleft())
+        return _PENDING
+
+    def drain(self):
+        """Process the references still in the window (end of stream)."""
+        while self.window:
+            yield self.access(self.window.popleft())
+
+    def _consume(self, page):
+        # the reference being processed leaves the window; its next use is
+        # the following position still queued for the page, if any
+        positions = self.pending[page]
+        positions.popleft()
+        if positions:
+            return positions[0]
+        del self.pending[page]
+        return math.inf
+
+    def on_hit(self, page, frame):
+        self._schedule(page, frame, self._consume(page))
+
+    def on_admit(self, page, frame):
+        self._schedule(page, frame, self._consume(page))
+
+@register_policy('clock')
+class Clock(ReplacementPolicy):
+    """Frames form a ring swept by a hand. Loading or hitting a page sets its
+    reference bit; on a fault the hand clears set bits until it reaches a
+    clear one and evicts that page. Amortized O(1): every bit cleared was set
+    by an earlier reference."""
+
+    def __init__(self, frames_count, refs=None):
+        super().__init__(frames_count)
+        self.pages = [None] * frames_count
+        self.ref = bytearray(frames_count)
+        self.hand = 0
+
+    def on_hit(self, page, frame):
+        self.ref[frame] = 1
+
+    def evict(self, page):
+        ref, hand = self.ref, self.hand
+        while ref[hand]:
+            ref[hand] = 0
+            hand += 1
+            if hand == self.frames_count:
+                hand = 0
+        self.hand = hand
+        return self.pages[hand]
+
+    def _search_start(self):
+        return self.hand, self.ref[self.hand]
+
+    def _search_skipped(self, start):
+        # frames the hand moved past; a full sweep lands back where it began
+        hand, was_set = start
+        moved = (self.hand - hand) % self.frames_count
+        return moved if moved or not was_set else self.frames_count
+
+    def on_admit(self, page, frame):
+        self.pages[frame] = page
+        self.ref[frame] = 1
+        self.hand = (frame + 1) % self.frames_count
+
+@register_policy('second-chance')
+class SecondChance(ReplacementPolicy):
+    """FIFO where a page referenced again since it was loaded (or since its
+    last second chance) is moved to the back of the queue once instead of
+    being evicted. Unlike Clock, loading a page does not set its bit."""
+
+    def __init__(self, frames_count, refs=None):
+        super().__init__(frames_count)
+        self.queue = deque()
+        self.referenced = set()
+
+    def on_hit(self, page, frame):
+        self.referenced.add(page)
+
+    def evict(self, page):
+        queue, referenced = self.queue, self.referenced
+        while True:
+            victim = queue.popleft()
+            if victim not in referenced:
+                return victim
+            referenced.discard(victim)
+            queue.append(victim)
+
+    def _search_start(self):
+        return len(self.referenced)
+
+    def _search_skipped(self, start):
+        return start - len(self.referenced)  # each page given a second chance lost its bit
+
+    def on_admit(self, page, frame):
+        self.queue.append(page)
+
+@register_policy('lfu')
+class LFU(ReplacementPolicy):
+    """Least frequently used with O(1) frequency buckets: count -> pages with
+    that count in LRU order, plus the current minimum count. Ties evict the
+    least recently used page. Counts are forgotten on eviction."""
+
+    def __init__(self, frames_count, refs=None):
+        super().__init__(frames_count)
+        self.freq = {}
+        self.buckets = {}
+        self.min_freq = 0
+
+    def on_hit(self, page, frame):
+        f = self.freq[page]
+        bucket = self.buckets[f]
+        del bucket[page]
+        if not bucket:
+            del self.buckets[f]
+            if self.min_freq == f:
+                self.min_freq = f + 1
+        self.freq[page] = f + 1
+        self.buckets.setdefault(f + 1, OrderedDict())[page] = None
+
+    def evict(self, page):
+        bucket = self.buckets[self.min_freq]
+        victim, _ = bucket.popitem(last=False)
+        if not bucket:
+            del self.buckets[self.min_freq]
+        del self.freq[victim]
+        return victim
+
+    def on_admit(self, page, frame):
+        self.freq[page] = 1
+        self.buckets.setdefault(1, OrderedDict())[page] = None
+        self.min_freq = 1
+
+@register_policy('arc')
+class ARC(ReplacementPolicy):
+    """Adaptive Replacement Cache (Megiddo & Modha). T1/T2 hold resident
+    pages seen once / at least twice, B1/B2 are ghost lists of pages recently
+    evicted from each, and the target size p of T1 adapts on ghost hits.
+    All lists are OrderedDicts (LRU first), so every step is O(1)."""
+
+    def __init__(self, frames_count, refs=None):
+        super().__init__(frames_count)
+        self.t1 = OrderedDict()
+        self.t2 = OrderedDict()
+        self.b1 = OrderedDict()
+        self.b2 = OrderedDict()
+        self.p = 0.0
+
+    def on_hit(self, page, frame):
+        if page in self.t1:
+            del self.t1[page]
+            self.t2[page] = None
+        else:
+            self.t2.move_to_end(page)
+
+    def _replace(self, in_b2):
+        t1 = self.t1
+        if t1 and (not self.t2 or (in_b2 and len(t1) == self.p) or len(t1) > self.p):
+            victim, _ = t1.popitem(last=False)
+            self.b1[victim] = None
+        else:
+            victim, _ = self.t2.popitem(last=False)
+            self.b2[victim] = None
+        return victim
+
+    def evict(self, page):
+        c = self.frames_count
+        t1, b1, b2 = self.t1, self.b1, self.b2
+        if page in b1:
+            self.p = min(c, self.p + max(len(b2) / len(b1), 1))
+            return self._replace(False)
+        if page in b2:
+            self.p = max(0, self.p - max(len(b1) / len(b2), 1))
+            return self._replace(True)
+        if len(t1) + len(b1) == c:
+            if len(t1) < c:
+                b1.popitem(last=False)
+                return self._replace(False)
+            victim, _ = t1.popitem(last=False)
+            return victim
+        if len(t1) + len(self.t2) + len(b1) + len(b2) >= 2 * c:
+            b2.popitem(last=False)
+        return self._replace(False)
+
+    def on_admit(self, page, frame):
+        if page in self.b1:
+            del self.b1[page]
+            self.t2[page] = None
+        elif page in self.b2:
+            del self.b2[page]
+            self.t2[page] = None
+        else:
+            self.t1[page] = None
+
+@register_policy('2q')
+class TwoQueue(ReplacementPolicy):
+    """Full 2Q (Johnson & Shasha). New pages enter the FIFO A1in; pages
+    evicted from it are remembered in the ghost FIFO A1out, and a fault on
+    a remembered page promotes it to the LRU list Am. kin and kout size
+    A1in and A1out as fractions of the frame count."""
+
+    def __init__(self, frames_count, refs=None, kin=0.25, kout=0.5):
+        super().__init__(frames_count)
+        self.kin = max(1, int(frames_count * kin))
+        self.kout = max(1, int(frames_count * kout))
+        self.a1in = OrderedDict()
+        self.a1out = OrderedDict()
+        self.am = OrderedDict()
+        self._promote = False
+
+    def on_hit(self, page, frame):
+        if page in self.am:
+            self.am.move_to_end(page)
+
+    def evict(self, page):
+        if page in self.a1out:
+            del self.a1out[page]
+            self._promote = True
+        if len(self.a1in) > self.kin or not self.am:
+            victim, _ = self.a1in.popitem(last=False)
+            self.a1out[victim] = None
+            if len(self.a1out) > self.kout:
+                self.a1out.popitem(last=False)
+            return victim
+        victim, _ = self.am.popitem(last=False)
+        return victim
+
+    def on_admit(self, page, frame):
+        if self._promote:
+            self._promote = False
+            self.am[page] = None
+        else:
+            self.a1in[page] = None
+
+def simulate(policy, refs, frames_count, record=True, **params):
+    """Run a registered policy (name or class) over refs.
+
+    Returns (timeline, faults) like the simulate_* functions; extra keyword
+    arguments are passed to the policy (e.g. kin/kout for '2q').
+    """
+    cls = POLICIES[policy] if isinstance(policy, str) else policy
+    if cls.needs_future:
+        refs = _as_sequence(refs)
+    return _drive(cls(frames_count, refs, **params).access, refs, frames_count, record)
+
+def _drive(access, refs, frames_count, record):
+    if not record:
+        faults = 0
+        for p in refs:
+            if access(p) is not None:
+                faults += 1
+        return None, faults
+    timeline = Timeline(frames_count)
+    append = timeline.append
+    for p in refs:
+        append(p, access(p))
+    return timeline, timeline.faults
+
+class _InstrumentedPolicy:
+    """Mixin placed in front of a policy class by instrument(). It wraps the
+    engine hooks with counters and perf_counter_ns timers, so plain policy
+    classes carry no instrumentation code on their per-reference path.
+
+    Policies that scan for a victim (Clock, second-chance, OPT) provide
+    _search_start() / _search_skipped(start), which derive how many
+    candidates were passed over from the state before and after evict();
+    only this mixin calls them."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.skipped = 0  # candidates passed over while choosing victims
+        self.calls = {'access': 0, 'on_hit': 0, 'evict': 0, 'on_admit': 0}
+        self.phase_ns = {'access': 0, 'on_hit': 0, 'evict': 0, 'on_admit': 0}
+
+    def access(self, page):
+        start = time.perf_counter_ns()
+        frame = super().access(page)
+        self.phase_ns['access'] += time.perf_counter_ns() - start
+        self.calls['access'] += 1
+        return frame
+
+    def on_hit(self, page, frame):
+        start = time.perf_counter_ns()
+        super().on_hit(page, frame)
+        self.phase_ns['on_hit'] += time.perf_counter_ns() - start
+        self.calls['on_hit'] += 1
+
+    def evict(self, page):
+        search = getattr(self, '_search_start', None)
+        search = search() if search else None
+        start = time.perf_counter_ns()
+        victim = super().evict(page)
+        self.phase_ns['evict'] += time.perf_counter_ns() - start
+        self.calls['evict'] += 1
+        if search is not None:
+            self.skipped += self._search_skipped(search)
+        return victim
+
+    def on_admit(self, page, frame):
+        start = time.perf_counter_ns()
+        super().on_admit(page, frame)
+        self.phase_ns['on_admit'] += time.perf_counter_ns() - start
+        self.calls['on_admit'] += 1
+
+    def report(self):
+        calls, ns = self.calls, self.phase_ns
+        hooks = ns['on_hit'] + ns['evict'] + ns['on_admit']
+        return {
+            'policy': self.name,
+            'frames': self.frames_count,
+            'references': calls['access'],
+            'hits': calls['on_hit'],
+            'faults': calls['on_admit'],
+            'membership_checks': calls['access'],
+            'evictions': calls['evict'],
+            'allocations': calls['on_admit'] - calls['evict'],  # faults served from free frames
+            'victim_search_iterations': calls['evict'] + self.skipped,
+            'phase_seconds': {
+                'lookup': (ns['access'] - hooks) / 1e9,
+                'hit_update': ns['on_hit'] / 1e9,
+                'victim_selection': ns['evict'] / 1e9,
+                'admission': ns['on_admit'] / 1e9,
+            },
+            'total_seconds': ns['access'] / 1e9,
+        }
+
+_instrumented_classes = {}
+
+def instrument(policy):
+    """Return an instrumented subclass of a policy (name or class). Only runs
+    that ask for it pay for counting and timing."""
+    cls = POLICIES[policy] if isinstance(policy, str) else policy
+    if cls not in _instrumented_classes:
+        _instrumented_classes[cls] = type(f"Instrumented{cls.__name__}", (_InstrumentedPolicy, cls), {})
+    return _instrumented_classes[cls]
+
+def profile_policy(policy, refs, frames_count, **params):
+    """Run one counts-only simulation with instrumentation and return the
+    report: membership checks, victim-search iterations, evictions,
+    allocations and time spent per phase. Timer overhead is included, so
+    compare policies against each other rather than against plain runs."""
+    cls = instrument(policy)
+    if cls.needs_future:
+        refs = _as_sequence(refs)
+    engine = cls(frames_count, refs, **params)
+    _drive(engine.access, refs, frames_count, record=False)
+    return engine.report()
+
+def export_pstats(reports, path):
+    """Write instrumentation reports as a marshalled pstats table, so the
+    phases can be browsed with pstats.Stats(path) or any cProfile viewer.
+    Each policy gets an '<policy>.access' entry with its phases as callees."""
+    stats = {}
+    for report in reports:
+        name = report['policy']
+        phases = report['phase_seconds']
+        access_key = ('page_replacement.py', 0, f"{name}.access")
+        calls = {'lookup': report['references'], 'hit_update': report['hits'],
+                 'victim_selection': report['evictions'], 'admission': report['faults']}
+        for phase, seconds in phases.items():
+            if phase == 'lookup':
+                continue
+            n = calls[phase]
+            stats[('page_replacement.py', 0, f"{name}.{phase}")] = (
+                n, n, seconds, seconds, {access_key: (n, n, seconds, seconds)})
+        n = report['references']
+        stats[access_key] = (n, n, phases['lookup'], report['total_seconds'], {})
+    with open(path, 'wb') as f:
+        marshal.dump(stats, f)
+
+def simulate_fifo(refs, frames_count, record=True):
+    return simulate('fifo', refs, frames_count, record)
+
+def simulate_lru(refs, frames_count, record=True):
+    return simulate('lru', refs, frames_count, record)
+
+def simulate_optimal(refs, frames_count, record=True):
+    return simulate('optimal', refs, frames_count, record)
+
+def _require_numpy(what):
+    if np is None:
+        raise ImportError(f"{what} needs NumPy. Install with: pip install numpy")
+
+class OnlineSimulator:
+    """Incremental simulator for a live page-reference stream.
+
+    access(page) costs O(1) for the registered policies. 'optimal' needs
+    lookahead=N: it sees only the next N references, so each outcome is
+    decided N accesses later (O(log F) per access) and flush() settles the
+    rest at the end of the stream. Counters can be read at any time; the
+    rolling hit rate covers the last `window` decided references.
+    """
+
+    def __init__(self, policy, frames_count, window=10000, lookahead=None, **params):
+        if window < 1:
+            raise ValueError(f"window must be at least 1 reference, got {window}")
+        cls = POLICIES[policy] if isinstance(policy, str) else policy
+        if cls.needs_future:
+            if not lookahead:
+                raise ValueError(f"{cls.name!r} needs future references; pass lookahead=N to run it online")
+            self.engine = LookaheadOptimal(frames_count, lookahead=lookahead)
+            self._step = self.engine.push
+        else:
+            self.engine = cls(frames_count, None, **params)
+            self._step = self.engine.access
+        self.hits = 0
+        self.faults = 0
+        self.window = window
+        self._recent = bytearray(window)  # ring of recent outcomes, 1 = fault
+        self._recent_pos = 0
+        self._recent_faults = 0
+
+    def access(self, page):
+        """Feed one reference. Returns True for a fault, False for a hit and
+        None while the outcome is still pending (lookahead OPT)."""
+        frame = self._step(page)
+        if frame is _PENDING:
+            return None
+        return self._record(frame is not None)
+
+    def _record(self, fault):
+        if fault:
+            self.faults += 1
+        else:
+            self.hits += 1
+        pos = self._recent_pos
+        self._recent_faults += fault - self._recent[pos]
+        self._recent[pos] = fault
+        self._recent_pos = pos + 1 if pos + 1 < self.window else 0
+        return fault
+
+    def flush(self):
+        """Decide every pending reference (lookahead OPT only)."""
+        if isinstance(self.engine, LookaheadOptimal):
+            for frame in self.engine.drain():
+                self._record(frame is not None)
+
+    @property
+    def references(self):
+        return self.hits + self.faults
+
+    @property
+    def hit_rate(self):
+        return self.hits / self.references if self.references else 0.0
+
+    @property
+    def rolling_hit_rate(self):
+        seen = min(self.references, self.window)
+        return (seen - self._recent_faults) / seen if seen else 0.0
+
+    def residents(self):
+        """Pages currently in memory, as a frame-index -> page dict."""
+        return {frame: page for page, frame in self.engine.resident.items()}
+
+    def snapshot(self):
+        return {
+            'policy': self.engine.name,
+            'frames': self.engine.frames_count,
+            'references': self.references,
+            'hits': self.hits,
+            'faults': self.faults,
+            'hit_rate': self.hit_rate,
+            'rolling_hit_rate': self.rolling_hit_rate,
+            'resident': len(self.engine.resident),
+        }
+
+def simulate_batch(traces, frames_count, policy='lru', pad=-1):
+    """Fault counts for many short traces at once, advanced in lockstep.
+
+    traces is a 2-D integer NumPy array with one trace per row, right-padded
+    with `pad`, or a list of sequences of different lengths (padded here).
+    Every step checks all traces for a hit with one vectorized comparison
+    and picks victims with argmin (LRU stamps) or a per-row ring pointer
+    (FIFO), so counts match simulate_lru / simulate_fifo exactly.
+    Returns an int64 array with one fault count per trace.
+    """
+    _require_numpy("simulate_batch")
+    if policy not in ('fifo', 'lru'):
+        raise ValueError(f"simulate_batch supports 'fifo' and 'lru', not {policy!r}")
+    if not isinstance(traces, np.ndarray):
+        lengths = [len(t) for t in traces]
+        padded = np.full((len(lengths), max(lengths, default=0)), pad, dtype=np.int64)
+        for row, t in enumerate(traces):
+            padded[row, :len(t)] = t
+        traces = padded
+    # one contiguous column per step
+    columns = np.ascontiguousarray(traces.T, dtype=np.int64)
+    count = traces.shape[0]
+    rows = np.arange(count)
+    frames = np.full((count, frames_count), -1, dtype=np.int64)
+    stamp = np.full((count, frames_count), -1, dtype=np.int64)  # LRU: last use, -1 = free
+    ring = np.zeros(count, dtype=np.int64)  # FIFO: next frame to replace
+    faults = np.zeros(count, dtype=np.int64)
+    lru = policy == 'lru'
+    for t, page in enumerate(columns):
+        active = page != pad
+        match = frames == page[:, None]
+        hit = match.any(axis=1) & active
+        if lru and hit.any():
+            stamp[rows[hit], match[hit].argmax(axis=1)] = t
+        miss = active & ~hit
+        if not miss.any():
             continue
-        # page fault:
-        if -1 in frames:
-            idx = frames.index(-1)
-            frames[idx] = p
-            q.append(idx)
-            timeline.append({'page': p, 'frames': frames.copy(), 'fault': True, 'replaced_index': idx})
-        else:
-            # replace FIFO
-            idx = q.popleft()
-            frames[idx] = p
-            q.append(idx)
-            timeline.append({'page': p, 'frames': frames.copy(), 'fault': True, 'replaced_index': idx})
-    faults = sum(1 for t in timeline if t['fault'])
-    return timeline, faults
-
-def simulate_lru(refs, frames_count):
-    frames = [-1] * frames_count
-    last_used = dict()  # page -> last index used
-    timeline = []
+        r = rows[miss]
+        if lru:
+            # free frames (stamp -1) come first, lowest index first
+            victim = stamp[r].argmin(axis=1)
+            stamp[r, victim] = t
+        else:
+            victim = ring[r]
+            ring[r] = (victim + 1) % frames_count
+        frames[r, victim] = page[r]
+        faults[r] += 1
+    return faults
+
+def lru_fault_curve(refs, max_frames=None):
+    """Faults for every LRU memory size in one pass (Mattson stack distances).
+
+    The stack distance of a reference is the number of distinct pages touched
+    since the previous reference to the same page; it is a hit for every
+    memory of at least that many frames. Distances are counted with a Fenwick
+    tree over reference positions that marks each page's latest occurrence,
+    so the pass is O(N log N).
+
+    Returns an array where curve[k] is the fault count with k frames,
+    for k = 0 .. max_frames (default: number of distinct pages).
+    """
+    refs = _as_sequence(refs)
+    n = len(refs)
+    tree = array('q', bytes(8 * (n + 1)))  # 1-based Fenwick tree over positions
+    last = {}
+    hist = {}  # stack distance -> number of references
     for i, p in enumerate(refs):
-        if p in frames:
-            last_used[p] = i
-            timeline.append({'page': p, 'frames': frames.copy(), 'fault': False, 'replaced_index': None})
-            continue
-        # fault
-        if -1 in frames:
-            idx = frames.index(-1)
-            frames[idx] = p
-            last_used[p] = i
-            timeline.append({'page': p, 'frames': frames.copy(), 'fault': True, 'replaced_index': idx})
-        else:
-            # evict least recently used page
-            # find page in frames with smallest last_used value
-            lrupage = None
-            lru_time = math.inf
-            for page in frames:
-                t = last_used.get(page, -1)
-                if t < lru_time:
-                    lru_time = t
-                    lrupage = page
-            idx = frames.index(lrupage)
-            # replace
-            del last_used[lrupage]
-            frames[idx] = p
-            last_used[p] = i
-            timeline.append({'page': p, 'frames': frames.copy(), 'fault': True, 'replaced_index': idx})
-    faults = sum(1 for t in timeline if t['fault'])
-    return timeline, faults
-
-def simulate_optimal(refs, frames_count):
-    frames = [-1] * frames_count
-    timeline = []
+        t = last.get(p)
+        if t is not None:
+            # distinct pages since t = latest-occurrence marks after position t
+            marked = 0
+            j = t + 1
+            while j > 0:
+                marked += tree[j]
+                j -= j & -j
+            d = len(last) - marked + 1
+            hist[d] = hist.get(d, 0) + 1
+            j = t + 1
+            while j <= n:
+                tree[j] -= 1
+                j += j & -j
+        j = i + 1
+        while j <= n:
+            tree[j] += 1
+            j += j & -j
+        last[p] = i
+    if max_frames is None:
+        max_frames = len(last)
+    return _curve_from_histogram(hist, n, max_frames)
+
+def optimal_fault_curve(refs, max_frames=None):
+    """Faults for every OPT (Belady) memory size in one pass.
+
+    Uses Mattson's OPT stack algorithm with priority = next use (from
+    next_use_indices): on each reference the page moves to the top and the
+    pages above its old depth are re-sorted pairwise, the one used later
+    sinking. The stack is truncated at max_frames, which does not change
+    the result for any k <= max_frames, so the pass is O(N * max_frames)
+    in the worst case and much less when most references hit near the top.
+
+    Returns an array where curve[k] is the fault count with k frames,
+    for k = 0 .. max_frames (default: number of distinct pages).
+    """
+    refs = _as_sequence(refs)
     n = len(refs)
+    if max_frames is None:
+        max_frames = len(set(refs))
+    next_use = next_use_indices(refs)
+    stack = []
+    depth = {}  # page -> index in stack (0 = top)
+    priority = {}  # page -> index of its next use
+    hist = {}
     for i, p in enumerate(refs):
-        if p in frames:
-            timeline.append({'page': p, 'frames': frames.copy(), 'fault': False, 'replaced_index': None})
+        priority[p] = next_use[i]
+        d = depth.get(p)
+        if d is not None:
+            hist[d + 1] = hist.get(d + 1, 0) + 1
+            if d == 0:
+                continue
+            end = d
+        else:
+            end = len(stack)
+        if max_frames == 0:
             continue
-        if -1 in frames:
-            idx = frames.index(-1)
-            frames[idx] = p
-            timeline.append({'page': p, 'frames': frames.copy(), 'fault': True, 'replaced_index': idx})
-        else:
-            # lookahead to find which page won't be used for the longest time
-            future_indices = {}
-            for page in frames:
-                found = None
-                for j in range(i+1, n):
-                    if refs[j] == page:
-                        found = j
-                        break
-                future_indices[page] = found if found is not None else math.inf
-            # choose page with max future index
-            victim = max(future_indices, key=lambda pg: future_indices[pg])
-            idx = frames.index(victim)
-            frames[idx] = p
-            timeline.append({'page': p, 'frames': frames.copy(), 'fault': True, 'replaced_index': idx})
-    faults = sum(1 for t in timeline if t['fault'])
-    return timeline, faults
-
-def print_timeline(timeline, frames_count, refs):
-    # Header
-    print("\nTimeline (columns = steps):")
-    header = "Step | Page | " + " | ".join(f"F{i}" for i in range(frames_count)) + " | Fault | Replaced"
-    print(header)
-    print("-" * len(header))
-    for step, entry in enumerate(timeline):
-        p = entry['page']
-        frames = entry['frames']
-        fault = entry['fault']
+        carry = p
+        for j in range(end):
+            y = stack[j]
+            if j == 0 or priority[y] > priority[carry]:
+                stack[j] = carry
+                depth[carry] = j
+                carry = y
+        if d is not None:
+            stack[d] = carry
+            depth[carry] = d
+        elif len(stack) < max_frames:
+            depth[carry] = len(stack)
+            stack.append(carry)
+        else:
+            del depth[carry]
+            del priority[carry]
+    return _curve_from_histogram(hist, n, max_frames)
+
+def _curve_from_histogram(hist, n, max_frames):
+    curve = array('q', [n]) * (max_frames + 1)
+    hits = 0
+    for k in range(1, max_frames + 1):
+        hits += hist.get(k, 0)
+        curve[k] = n - hits
+    return curve
+
+def fifo_belady_anomalies(refs, frame_counts):
+    """Run FIFO (counts only) at the sampled frame counts and report every
+    pair of neighbouring samples where more frames gave more faults.
+
+    FIFO is not a stack algorithm, so it has no one-pass curve. Returns
+    ({frames: faults}, [(frames_a, frames_b, faults_a, faults_b), ...]).
+    """
+    refs = _as_sequence(refs)
+    samples = sorted(set(frame_counts))
+    faults = {k: simulate_fifo(refs, k, record=False)[1] for k in samples}
+    anomalies = [(a, b, faults[a], faults[b])
+                 for a, b in zip(samples, samples[1:]) if faults[b] > faults[a]]
+    return faults, anomalies
+
+def fault_curves(refs, max_frames=None, fifo_samples=None):
+    """Faults-vs-frames curves for LRU and OPT plus a FIFO Belady check.
+
+    fifo_samples defaults to every frame count up to 32 and then about 32
+    evenly spaced counts up to max_frames.
+    """
+    refs = _as_sequence(refs)
+    if max_frames is None:
+        max_frames = len(set(refs))
+    if fifo_samples is None:
+        step = max(1, max_frames // 32)
+        fifo_samples = list(range(1, min(max_frames, 32) + 1)) + list(range(32, max_frames + 1, step))
+    fifo, anomalies = fifo_belady_anomalies(refs, [k for k in fifo_samples if k >= 1])
+    return {
+        'lru': lru_fault_curve(refs, max_frames),
+        'optimal': optimal_fault_curve(refs, max_frames),
+        'fifo': fifo,
+        'belady_anomalies': anomalies,
+    }
+
+def working_set_sizes(refs, delta):
+    """W(t, delta) for every t: the number of distinct pages among the last
+    `delta` references refs[t-delta+1 .. t].
+
+    One O(N) pass with a last-occurrence map: a reference enters the window
+    if its page's previous occurrence is outside it, and refs[t-delta]
+    leaves if that was its page's last occurrence.
+    """
+    refs = _as_sequence(refs)
+    last = {}
+    sizes = array('q')
+    w = 0
+    for t, p in enumerate(refs):
+        prev = last.get(p)
+        if prev is None or prev < t - delta:
+            w += 1
+        last[p] = t
+        if t >= delta and last[refs[t - delta]] == t - delta:
+            w -= 1
+        sizes.append(w)
+    return sizes
+
+def working_set_curve(refs, deltas):
+    """Mean working-set size and working-set-policy faults for many window
+    sizes from a single pass over the trace.
+
+    Each reference i keeps its page in the window for min(gap_i, delta)
+    steps, gap_i being the distance to the page's next reference (or to
+    the end of the trace), so sum_t W(t, delta) = sum_i min(gap_i, delta).
+    A reference faults under the working-set policy when its backward gap
+    exceeds delta. Both come from gap histograms, so the cost is
+    O(N + max(deltas)).
+
+    Returns {'deltas', 'mean_size', 'faults'} with one entry per delta.
+    """
+    n = 0
+    last = {}
+    gaps = {}  # forward gap -> count (backward gaps have the same finite values)
+    for t, p in enumerate(refs):
+        prev = last.get(p)
+        if prev is not None:
+            gaps[t - prev] = gaps.get(t - prev, 0) + 1
+        last[p] = t
+        n = t + 1
+    repeats = n - len(last)  # references with a finite backward gap
+    residual = {}  # gap from a page's last reference to the end of the trace
+    for t in last.values():
+        residual[n - t] = residual.get(n - t, 0) + 1
+    deltas = sorted(set(deltas))
+    mean_size = array('d')
+    faults = array('q')
+    at_least = n  # references with forward gap >= k (every gap is >= 1)
+    window_total = 0  # sum_i min(gap_i, k)
+    short = 0  # finite gaps <= k
+    k = 0
+    for delta in deltas:
+        while k < delta:
+            k += 1
+            window_total += at_least
+            at_least -= gaps.get(k, 0) + residual.get(k, 0)
+            short += gaps.get(k, 0)
+        mean_size.append(window_total / n if n else 0.0)
+        faults.append(len(last) + repeats - short)
+    return {'deltas': deltas, 'mean_size': mean_size, 'faults': faults}
+
+def simulate_pff(refs, threshold):
+    """Page-fault-frequency replacement with a variable resident set.
+
+    Every fault adds the page. If more than `threshold` references passed
+    since the previous fault, pages not referenced since that fault are
+    released first. Residents are kept in recency order with their last
+    reference time, so releasing is a pop from the front (amortized O(1)).
+
+    Returns {'references', 'faults', 'mean_resident', 'max_resident'}.
+    """
+    resident = OrderedDict()  # page -> last reference time, least recent first
+    faults = 0
+    last_fault = None
+    total = peak = 0
+    t = -1
+    for t, p in enumerate(refs):
+        if p in resident:
+            resident.move_to_end(p)
+            resident[p] = t
+        else:
+            faults += 1
+            if last_fault is not None and t - last_fault > threshold:
+                while resident and next(iter(resident.values())) < last_fault:
+                    resident.popitem(last=False)
+            resident[p] = t
+            last_fault = t
+            if len(resident) > peak:
+                peak = len(resident)
+        total += len(resident)
+    references = t + 1
+    return {
+        'references': references,
+        'faults': faults,
+        'mean_resident': total / references if references else 0.0,
+        'max_resident': peak,
+    }
+
+def _round_robin_keys(pid, trace, quantum):
+    for k, page in enumerate(trace):
+        yield (k // quantum, pid, k % quantum), pid, page
+
+def _timestamp_keys(pid, trace):
+    for timestamp, page in trace:
+        yield (timestamp, pid), pid, page
+
+def interleave(traces, scheduler='round-robin', quantum=1):
+    """Merge per-process traces into one (pid, page) stream with heapq.merge.
+
+    'round-robin' gives each process `quantum` references per turn; with
+    'timestamp' every trace yields (timestamp, page) pairs in time order
+    and ties go to the lower pid. Traces are consumed lazily, so only one
+    pending reference per process is held in memory.
+    """
+    if scheduler == 'round-robin':
+        streams = [_round_robin_keys(pid, trace, quantum) for pid, trace in enumerate(traces)]
+    elif scheduler == 'timestamp':
+        streams = [_timestamp_keys(pid, trace) for pid, trace in enumerate(traces)]
+    else:
+        raise ValueError(f"unknown scheduler {scheduler!r}")
+    for _, pid, page in heapq.merge(*streams, key=itemgetter(0)):
+        yield pid, page
+
+def simulate_multiprocess(traces, frames_count, policy='lru', allocation='global', quotas=None,
+                          scheduler='round-robin', quantum=1, thrash_window=1000, thrash_threshold=0.5,
+                          **params):
+    """Simulate several processes sharing `frames_count` frames.
+
+    With allocation='global' one policy instance manages every frame and
+    a fault in one process may evict another's page (pages are keyed by
+    (pid, page)). With 'local' each process replaces only within its own
+    quota (default: an even split). References are interleaved by
+    interleave(scheduler, quantum).
+
+    Each process's references are cut into windows of `thrash_window`;
+    a window whose fault rate exceeds `thrash_threshold` counts as
+    thrashing. Returns totals plus one stats dict per process.
+    """
+    cls = POLICIES[policy] if isinstance(policy, str) else policy
+    count = len(traces)
+    if allocation == 'local':
+        if quotas is None:
+            quotas = [frames_count // count + (pid < frames_count % count) for pid in range(count)]
+        if len(quotas) != count or min(quotas, default=1) < 1:
+            raise ValueError("local allocation needs one quota of at least 1 frame per process")
+        if cls.needs_future:
+            traces = [list(t) for t in traces]
+            # the engine sees pages only; timestamped traces carry (time, page)
+            futures = [[p for _, p in t] if scheduler == 'timestamp' else t for t in traces]
+        engines = [cls(quota, futures[pid] if cls.needs_future else None, **params).access
+                   for pid, quota in enumerate(quotas)]
+        stream = interleave(traces, scheduler, quantum)
+        accesses = ((pid, page, engines[pid](page)) for pid, page in stream)
+    elif allocation == 'global':
+        stream = interleave(traces, scheduler, quantum)
+        if cls.needs_future:
+            stream = list(stream)
+        access = cls(frames_count, stream, **params).access
+        accesses = ((pid, page, access((pid, page))) for pid, page in stream)
+    else:
+        raise ValueError(f"unknown allocation {allocation!r}")
+
+    references = [0] * count
+    faults = [0] * count
+    window_faults = [0] * count
+    thrashing = [0] * count
+    limit = thrash_threshold * thrash_window
+    for pid, page, frame in accesses:
+        references[pid] += 1
+        if frame is not None:
+            faults[pid] += 1
+            window_faults[pid] += 1
+        if references[pid] % thrash_window == 0:
+            if window_faults[pid] > limit:
+                thrashing[pid] += 1
+            window_faults[pid] = 0
+    processes = [{
+        'pid': pid,
+        'references': references[pid],
+        'faults': faults[pid],
+        'fault_rate': faults[pid] / references[pid] if references[pid] else 0.0,
+        'windows': references[pid] // thrash_window,
+        'thrashing_windows': thrashing[pid],
+    } for pid in range(count)]
+    if allocation == 'local':
+        for proc, quota in zip(processes, quotas):
+            proc['frames'] = quota
+    return {
+        'policy': cls.name,
+        'allocation': allocation,
+        'frames': frames_count,
+        'references': sum(references),
+        'faults': sum(faults),
+        'processes': processes,
+    }
+
+TRACE_FORMATS = ('text', 'int32', 'int64')
+_TYPECODES = {'int32': 'i', 'int64': 'q'}  # native byte order
+
+def iter_trace(path, fmt='text', chunk_size=1 << 20):
+    """Yield page numbers from a trace file, reading it in chunks.
+
+    fmt is 'text' (whitespace or comma separated integers, '-' reads stdin)
+    or 'int32' / 'int64' (packed native-endian integers). Only one chunk
+    is held in memory at a time.
+    """
+    if fmt == 'text':
+        f = sys.stdin if path == '-' else open(path, 'r')
+        try:
+            pending = ''
+            for chunk in iter(lambda: f.read(chunk_size), ''):
+                tokens = (pending + chunk).replace(',', ' ').split()
+                # a token cut at the chunk boundary is finished by the next read
+                pending = '' if chunk[-1].isspace() or chunk[-1] == ',' or not tokens else tokens.pop()
+                for tok in tokens:
+                    yield int(tok)
+            if pending:
+                yield int(pending)
+        finally:
+            if f is not sys.stdin:
+                f.close()
+        return
+    typecode = _TYPECODES[fmt]
+    itemsize = array(typecode).itemsize
+    with open(path, 'rb') as f:
+        for data in iter(lambda: f.read(chunk_size * itemsize), b''):
+            if len(data) % itemsize:
+                raise ValueError(f"{path}: size is not a multiple of {itemsize} bytes")
+            chunk = array(typecode)
+            chunk.frombytes(data)
+            yield from chunk
+
+def map_trace(path, fmt='int64'):
+    """Memory-map a binary trace and return it as a read-only integer
+    sequence. Pages are read from the OS page cache on access, so this
+    works for traces larger than RAM wherever random access is needed."""
+    typecode = _TYPECODES[fmt]
+    itemsize = array(typecode).itemsize
+    size = os.path.getsize(path)
+    if size % itemsize:
+        raise ValueError(f"{path}: size is not a multiple of {itemsize} bytes")
+    if size == 0:
+        return array(typecode)
+    with open(path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(mm).cast(typecode)
+
+def load_trace(path, fmt='text', use_mmap=False):
+    """Random-access view of a trace: mapped for binary files when use_mmap
+    is set, otherwise packed into an int64 array (8 bytes per reference)."""
+    if use_mmap and fmt != 'text':
+        return map_trace(path, fmt)
+    return array('q', iter_trace(path, fmt))
+
+def convert_trace(src_path, dst_path, fmt='text', out_fmt='int64', chunk_size=1 << 20):
+    """Rewrite a trace as a packed binary file, one chunk at a time."""
+    typecode = _TYPECODES[out_fmt]
+    with open(dst_path, 'wb') as out:
+        chunk = array(typecode)
+        for p in iter_trace(src_path, fmt, chunk_size):
+            chunk.append(p)
+            if len(chunk) == chunk_size:
+                chunk.tofile(out)
+                chunk = array(typecode)
+        chunk.tofile(out)
+
+ADDRESS_FORMATS = ('lackey', 'hex', 'dec')
+
+def _parse_addresses(lines, fmt, instructions):
+    if fmt == 'lackey':
+        # Valgrind Lackey: "I  0400d7d4,8" / " L 04222cac,4" / " S ..." / " M ...";
+        # the address always starts at column 3. Other lines (==pid== ...) are skipped.
+        return [int(line[3:line.index(',', 3)], 16) for line in lines
+                if line[:2] in (' L', ' S', ' M') or (instructions and line[:1] == 'I')]
+    base = 16 if fmt == 'hex' else 10
+    return [int(line, base) for line in lines if line.strip()]
+
+def addresses_to_pages(addresses, page_size=4096, collapse=True, previous=None):
+    """Vectorized byte address -> page number conversion.
+
+    With collapse, a reference to the same page as the one just before it
+    is dropped: it is a hit under any policy. That is exact for FIFO, LRU,
+    OPT, Clock and 2Q; LFU, ARC and Second-Chance react to repeated hits,
+    so use collapse=False when simulating those. `previous` is the last
+    page of the preceding chunk. Returns an int64 NumPy array.
+    """
+    _require_numpy("addresses_to_pages")
+    addrs = np.asarray(addresses, dtype=np.uint64)
+    if page_size & (page_size - 1) == 0:
+        pages = addrs >> np.uint64(page_size.bit_length() - 1)
+    else:
+        pages = addrs // np.uint64(page_size)
+    pages = pages.astype(np.int64)
+    if collapse and len(pages):
+        keep = np.empty(len(pages), dtype=bool)
+        keep[0] = previous is None or pages[0] != previous
+        np.not_equal(pages[1:], pages[:-1], out=keep[1:])
+        pages = pages[keep]
+    return pages
+
+def iter_address_chunks(path, fmt='lackey', page_size=4096, collapse=True, instructions=True,
+                        chunk_bytes=1 << 22):
+    """Read a memory-address trace in chunks of about `chunk_bytes` and yield
+    (addresses_read, pages) pairs, pages being int64 NumPy arrays.
+
+    fmt is 'lackey' (valgrind --tool=lackey --trace-mem=yes output), or
+    'hex' / 'dec' for one address per line. instructions=False skips
+    Lackey instruction fetches.
+    """
+    previous = None
+    with open(path, 'r') as f:
+        while True:
+            lines = f.readlines(chunk_bytes)
+            if not lines:
+                break
+            addresses = _parse_addresses(lines, fmt, instructions)
+            pages = addresses_to_pages(addresses, page_size, collapse, previous)
+            if len(pages):
+                previous = pages[-1]
+            yield len(addresses), pages
+
+def iter_address_trace(path, fmt='lackey', page_size=4096, collapse=True, instructions=True):
+    """Page numbers of a memory-address trace as a stream of ints, ready to
+    pass to simulate()."""
+    for _, pages in iter_address_chunks(path, fmt, page_size, collapse, instructions):
+        yield from pages.tolist()
+
+def convert_address_trace(src_path, dst_path, fmt='lackey', out_fmt='int64', page_size=4096,
+                          collapse=True, instructions=True):
+    """Write the page numbers of an address trace as a packed binary trace
+    and return {'addresses', 'references', 'collapsed'} counts."""
+    _require_numpy("convert_address_trace")
+    dtype = np.int32 if out_fmt == 'int32' else np.int64
+    addresses = references = 0
+    with open(dst_path, 'wb') as out:
+        for count, pages in iter_address_chunks(src_path, fmt, page_size, collapse, instructions):
+            if dtype is np.int32 and len(pages) and pages.max() > np.iinfo(np.int32).max:
+                raise ValueError("page numbers do not fit in int32; use int64")
+            pages.astype(dtype).tofile(out)
+            addresses += count
+            references += len(pages)
+    return {'addresses': addresses, 'references': references, 'collapsed': addresses - references}
+
+def _timeline_steps(timeline, start, stop):
+    # Timeline objects replay their deltas; plain lists of step dicts
+    # (the old format) are sliced.
+    if isinstance(timeline, Timeline):
+        yield from timeline.steps(start, stop)
+        return
+    for step in range(*slice(start, stop).indices(len(timeline))):
+        entry = timeline[step]
         ridx = entry['replaced_index']
-        frames_str = []
-        for fi, val in enumerate(frames):
-            cell = str(val) if val != -1 else "."
-            if fault and ridx == fi:
+        yield step, entry['page'], entry['frames'], -1 if ridx is None else ridx
+
+def render_timeline(timeline, frames_count, out=None, start=0, stop=None, color=None, chunk_lines=4096):
+    """Write the step table for steps [start, stop) to `out` (default stdout).
+
+    Rows are joined and written in chunks of `chunk_lines` rather than one
+    print per step. Colour defaults to on only when `out` is a terminal.
+    """
+    out = out or sys.stdout
+    if color is None:
+        color = hasattr(out, 'isatty') and out.isatty()
+    fault_str = f"{CLR_RED}FAULT{CLR_RESET}" if color else "FAULT"
+    hit_str = f"{CLR_GREEN}HIT{CLR_RESET}" if color else "HIT"
+    header = "Step | Page | " + " | ".join(f"F{i}" for i in range(frames_count)) + " | Fault | Replaced"
+    lines = ["", "Timeline (columns = steps):", header, "-" * len(header)]
+    for step, p, frames, ridx in _timeline_steps(timeline, start, stop):
+        cells = ["." if val == -1 else val for val in frames]
+        if ridx != -1:
+            if color:
                 # replaced frame
-                cell = f"{CLR_YELLOW}{cell}{CLR_RESET}"
-            frames_str.append(cell)
-        fault_str = f"{CLR_RED}FAULT{CLR_RESET}" if fault else f"{CLR_GREEN}HIT{CLR_RESET}"
-        replaced = str(ridx) if ridx is not None else "-"
-        print(f"{step:>4} | {p:>4} | " + " | ".join(f"{c:>3}" for c in frames_str) + f" | {fault_str:>5} | {replaced:>7}")
+                cells[ridx] = f"{CLR_YELLOW}{cells[ridx]}{CLR_RESET}"
+            status, replaced = fault_str, ridx
+        else:
+            status, replaced = hit_str, "-"
+        lines.append(f"{step:>4} | {p:>4} | " + " | ".join(f"{c:>3}" for c in cells) + f" | {status:>5} | {replaced:>7}")
+        if len(lines) >= chunk_lines:
+            out.write("\n".join(lines) + "\n")
+            lines.clear()
+    if lines:
+        out.write("\n".join(lines) + "\n")
+
+def print_timeline(timeline, frames_count, refs, start=0, stop=None, color=None):
+    render_timeline(timeline, frames_count, start=start, stop=stop, color=color)
+
+def export_timeline(timeline, out, fmt='csv', start=0, stop=None, chunk_steps=65536):
+    """Write steps [start, stop) of a Timeline as CSV or NDJSON.
+
+    Rows come straight from the page / replaced-frame arrays (one row per
+    step: step, page, fault, replaced_index), so frame contents are never
+    materialized. Output is written in chunks of `chunk_steps` rows.
+    """
+    start, stop, _ = slice(start, stop).indices(len(timeline))
+    pages, replaced = timeline.pages, timeline.replaced
+    if fmt == 'csv':
+        out.write("step,page,fault,replaced_index\n")
+        row = "{},{},{},{}\n".format
+        fault, missing = (0, 1), ""
+    elif fmt == 'ndjson':
+        row = '{{"step": {}, "page": {}, "fault": {}, "replaced_index": {}}}\n'.format
+        fault, missing = ("false", "true"), "null"
+    else:
+        raise ValueError(f"unknown export format {fmt!r}")
+    # non-integer page labels (a list, not an int64 array) need JSON quoting
+    quote = json.dumps if fmt == 'ndjson' and isinstance(pages, list) else None
+    for lo in range(start, stop, chunk_steps):
+        hi = min(lo + chunk_steps, stop)
+        chunk = map(quote, pages[lo:hi]) if quote else pages[lo:hi]
+        out.write("".join(
+            row(step, p, fault[r != -1], missing if r == -1 else r)
+            for step, p, r in zip(range(lo, hi), chunk, replaced[lo:hi])
+        ))
 
 def run_interactive():
     print("Page Replacement Visualizer (FIFO, LRU, Optimal)\n")
@@ -156,6 +1438,320 @@ def run_interactive():
     print_timeline(t_opt, frames_count, refs)
     print(f"\nTotal page faults (Optimal): {f_opt} / {len(refs)} ({f_opt/len(refs):.2%})")
 
+def run_trace(path, policy, frames_count, fmt='text', use_mmap=False):
+    """Simulate one policy over a trace file in counts-only mode and return
+    a result dict. Most policies consume the trace as a stream; OPT needs
+    random access and goes through load_trace."""
+    if POLICIES[policy].needs_future or use_mmap:
+        refs = load_trace(path, fmt, use_mmap)
+        _, faults = simulate(policy, refs, frames_count, record=False)
+        references = len(refs)
+    else:
+        count = [0]
+
+        def counted(stream):
+            for count[0], p in enumerate(stream, 1):
+                yield p
+
+        _, faults = simulate(policy, counted(iter_trace(path, fmt)), frames_count, record=False)
+        references = count[0]
+    hits = references - faults
+    return {
+        'trace': path,
+        'policy': policy,
+        'frames': frames_count,
+        'references': references,
+        'faults': faults,
+        'hits': hits,
+        'hit_rate': hits / references if references else 0.0,
+    }
+
+def trace_digest(refs, chunk_size=1 << 16):
+    """Streaming BLAKE2b digest of a page trace, hashed as packed int64
+    values so the same pages give the same digest whatever the source."""
+    h = hashlib.blake2b(digest_size=20)
+    if (isinstance(refs, array) and refs.typecode == 'q') or (isinstance(refs, memoryview) and refs.format == 'q'):
+        h.update(refs)
+        return h.hexdigest()
+    it = iter(refs)
+    while True:
+        chunk = array('q', islice(it, chunk_size))
+        if not chunk:
+            break
+        h.update(chunk)
+    return h.hexdigest()
+
+DEFAULT_CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'page_replacement')
+
+class ResultCache:
+    """On-disk cache of simulation results.
+
+    Entries are keyed by (trace digest, policy, frames, parameters) and
+    stored as one small JSON file each. A hit refreshes the file's mtime,
+    and when the directory grows past max_bytes the least recently used
+    entries are deleted.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=64 << 20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._size = None  # bytes on disk, computed on the first put
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, digest, policy, frames_count, params=None):
+        blob = json.dumps([digest, policy, frames_count, params or {}], sort_keys=True)
+        return hashlib.blake2b(blob.encode(), digest_size=20).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.json')
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+            os.utime(path)  # mark as recently used; may race with another process's eviction
+        except (OSError, ValueError):
+            return None
+        return result
+
+    def put(self, key, result):
+        path = self._path(key)
+        data = json.dumps(result).encode()
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)  # atomic, so concurrent readers never see half a file
+        if self._size is None:
+            self._size = sum(e.stat().st_size for e in os.scandir(self.directory) if e.name.endswith('.json'))
+        else:
+            self._size += len(data)
+        if self._size > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        entries = sorted((e.stat().st_mtime, e.stat().st_size, e.path)
+                         for e in os.scandir(self.directory) if e.name.endswith('.json'))
+        self._size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self._size <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self._size -= size
+
+def cached_simulate(policy, refs, frames_count, cache=None, **params):
+    """Counts-only simulate() memoized in a ResultCache (default location
+    DEFAULT_CACHE_DIR). Returns a dict with references, faults, hits and
+    hit_rate; repeat calls with the same trace and configuration only
+    hash the trace."""
+    refs = _as_sequence(refs)
+    cache = cache or ResultCache()
+    key = cache.key(trace_digest(refs), policy, frames_count, params)
+    result = cache.get(key)
+    if result is None:
+        _, faults = simulate(policy, refs, frames_count, record=False, **params)
+        references = len(refs)
+        result = {
+            'policy': policy,
+            'frames': frames_count,
+            'references': references,
+            'faults': faults,
+            'hits': references - faults,
+            'hit_rate': (references - faults) / references if references else 0.0,
+        }
+        cache.put(key, result)
+    return result
+
+def _sweep_job(path, fmt, trace, policy, frames_count):
+    # Runs in a worker process: the trace is mapped, not pickled, so every
+    # worker shares the same pages through the OS page cache.
+    refs = map_trace(path, fmt)
+    start = time.perf_counter()
+    _, faults = simulate(policy, refs, frames_count, record=False)
+    seconds = time.perf_counter() - start
+    references = len(refs)
+    hits = references - faults
+    return {
+        'trace': trace,
+        'policy': policy,
+        'frames': frames_count,
+        'references': references,
+        'faults': faults,
+        'hits': hits,
+        'hit_rate': hits / references if references else 0.0,
+        'seconds': round(seconds, 6),
+    }
+
+def _cached_row(result):
+    # the stored timing belongs to whichever run filled the cache
+    result.pop('seconds', None)
+    result['cached'] = True
+    return result
+
+def sweep(traces, policies, frame_counts, fmt='text', jobs=None, cache=None):
+    """Simulate every trace x policy x frame count on a process pool and
+    yield the result dicts as the jobs finish.
+
+    Binary traces are memory-mapped by each worker; text traces are first
+    converted once to a temporary int64 file so they can be mapped too.
+    jobs defaults to the number of CPUs. With a ResultCache, configurations
+    already in it are yielded straight away, without 'seconds' and with
+    'cached' set, and only the rest are run.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {}
+            for ti, trace in enumerate(traces):
+                path, trace_fmt = trace, fmt
+                if fmt == 'text':
+                    path, trace_fmt = os.path.join(tmp, f"trace{ti}.bin"), 'int64'
+                    convert_trace(trace, path)
+                digest = trace_digest(map_trace(path, trace_fmt)) if cache else None
+                for policy in policies:
+                    for frames_count in frame_counts:
+                        key = cache.key(digest, policy, frames_count) if cache else None
+                        result = cache.get(key) if cache else None
+                        if result is not None:
+                            result['trace'] = trace
+                            yield _cached_row(result)
+                            continue
+                        futures[pool.submit(_sweep_job, path, trace_fmt, trace, policy, frames_count)] = key
+            for future in as_completed(futures):
+                result = future.result()
+                if cache:
+                    cache.put(futures[future], result)
+                result['cached'] = False
+                yield result
+
+RESULT_FIELDS = ('trace', 'policy', 'frames', 'references', 'faults', 'hits', 'hit_rate', 'seconds', 'cached')
+
+def write_results(results, out, csv_format=False):
+    """Write result dicts to `out` as they arrive (CSV or JSON lines),
+    flushing after each row so partial sweeps are kept."""
+    if csv_format:
+        # fixed columns: rows served from the cache have no timing
+        writer = csv.DictWriter(out, fieldnames=RESULT_FIELDS, restval="", extrasaction="ignore")
+        writer.writeheader()
+    for result in results:
+        if csv_format:
+            writer.writerow(result)
+        else:
+            out.write(json.dumps(result) + "\n")
+        out.flush()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Page replacement simulator. Run without arguments for the interactive visualizer.")
+    sub = parser.add_subparsers(dest="command")
+    run = sub.add_parser("run", help="Simulate a trace file and print one JSON result per line.")
+    run.add_argument("trace", help="Trace file ('-' reads a text trace from stdin).")
+    run.add_argument("--format", "-f", default="text", choices=TRACE_FORMATS,
+                     help="Trace encoding: text integers or packed native-endian int32/int64.")
+    run.add_argument("--frames", "-n", type=int, nargs="+", required=True, help="Frame count(s) to simulate.")
+    run.add_argument("--policy", "-p", nargs="+", default=['fifo', 'lru', 'optimal'], choices=list(POLICIES),
+                     help="Policies to simulate (default: fifo lru optimal).")
+    run.add_argument("--mmap", action="store_true", help="Memory-map binary traces instead of streaming them.")
+    run.add_argument("--cache-dir", help="Reuse results cached in this directory (keyed by trace digest).")
+    tl = sub.add_parser("timeline", help="Record one run and print or export a window of its timeline.")
+    tl.add_argument("trace", help="Trace file ('-' reads a text trace from stdin).")
+    tl.add_argument("--format", "-f", default="text", choices=TRACE_FORMATS, help="Encoding of the trace file.")
+    tl.add_argument("--frames", "-n", type=int, required=True, help="Frame count.")
+    tl.add_argument("--policy", "-p", default="lru", choices=list(POLICIES))
+    tl.add_argument("--steps", default=":", help="Window START:STOP of steps to show (default: all).")
+    tl.add_argument("--export", choices=["csv", "ndjson"], help="Write machine-readable rows instead of the table.")
+    tl.add_argument("--color", action=argparse.BooleanOptionalAction, default=None,
+                    help="Force colour on or off (default: only on a terminal).")
+    cv = sub.add_parser("convert", help="Convert a trace (e.g. raw addresses from Valgrind Lackey) to a binary page trace.")
+    cv.add_argument("source", help="Input trace file.")
+    cv.add_argument("dest", help="Output binary trace file.")
+    cv.add_argument("--from", dest="source_format", default="lackey", choices=ADDRESS_FORMATS + TRACE_FORMATS,
+                    help="Input format: address traces (lackey, hex, dec) or page traces (default: lackey).")
+    cv.add_argument("--to", dest="dest_format", default="int64", choices=["int32", "int64"])
+    cv.add_argument("--page-size", type=int, default=4096, help="Page size in bytes for address traces.")
+    cv.add_argument("--no-collapse", action="store_true",
+                    help="Keep consecutive references to the same page (needed for exact LFU/ARC/second-chance).")
+    cv.add_argument("--data-only", action="store_true", help="Skip Lackey instruction fetches.")
+    pr = sub.add_parser("profile", help="Instrumented run: operation counts and time per phase, as JSON.")
+    pr.add_argument("trace", help="Trace file.")
+    pr.add_argument("--format", "-f", default="text", choices=TRACE_FORMATS, help="Encoding of the trace file.")
+    pr.add_argument("--frames", "-n", type=int, required=True, help="Frame count.")
+    pr.add_argument("--policy", "-p", nargs="+", default=list(POLICIES), choices=list(POLICIES))
+    pr.add_argument("--pstats", help="Also write a cProfile-compatible stats file here.")
+    sw = sub.add_parser("sweep", help="Simulate traces x policies x frame counts on all cores.")
+    sw.add_argument("traces", nargs="+", help="Trace files.")
+    sw.add_argument("--format", "-f", default="text", choices=TRACE_FORMATS, help="Encoding of the trace files.")
+    sw.add_argument("--frames", "-n", type=int, nargs="+", required=True, help="Frame counts to simulate.")
+    sw.add_argument("--policy", "-p", nargs="+", default=list(POLICIES), choices=list(POLICIES),
+                    help="Policies to simulate (default: all).")
+    sw.add_argument("--jobs", "-j", type=int, default=None, help="Worker processes (default: CPU count).")
+    sw.add_argument("--cache-dir", help="Reuse results cached in this directory (keyed by trace digest).")
+    sw.add_argument("--out", "-o", help="Output file; .csv writes CSV, anything else JSON lines (default: stdout).")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command is None:
+        run_interactive()
+        return
+    if args.command == "timeline":
+        lo, _, hi = args.steps.partition(":")
+        start, stop = int(lo or 0), int(hi) if hi else None
+        refs = iter_trace(args.trace, args.format)
+        timeline, _ = simulate(args.policy, refs, args.frames)
+        if args.export:
+            export_timeline(timeline, sys.stdout, args.export, start, stop)
+        else:
+            render_timeline(timeline, args.frames, start=start, stop=stop, color=args.color)
+        return
+    if args.command == "convert":
+        if args.source_format in ADDRESS_FORMATS:
+            stats = convert_address_trace(args.source, args.dest, args.source_format, args.dest_format,
+                                          args.page_size, not args.no_collapse, not args.data_only)
+        else:
+            convert_trace(args.source, args.dest, args.source_format, args.dest_format)
+            stats = {'references': os.path.getsize(args.dest) // array(_TYPECODES[args.dest_format]).itemsize}
+        print(json.dumps(stats))
+        return
+    if args.command == "profile":
+        refs = load_trace(args.trace, args.format)
+        reports = []
+        for policy in args.policy:
+            reports.append(profile_policy(policy, refs, args.frames))
+            print(json.dumps(reports[-1]), flush=True)
+        if args.pstats:
+            export_pstats(reports, args.pstats)
+        return
+    if args.command == "sweep":
+        out = open(args.out, "w", newline="") if args.out else sys.stdout
+        try:
+            cache = ResultCache(args.cache_dir) if args.cache_dir else None
+            results = sweep(args.traces, args.policy, args.frames, args.format, args.jobs, cache)
+            write_results(results, out, csv_format=bool(args.out) and args.out.endswith(".csv"))
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        return
+    if args.trace == '-' and (args.format != 'text' or len(args.policy) * len(args.frames) > 1 or args.cache_dir):
+        sys.exit("stdin traces support a single uncached text-format run; pass a file path instead.")
+    cache = ResultCache(args.cache_dir) if args.cache_dir else None
+    digest = trace_digest(iter_trace(args.trace, args.format)) if cache else None
+    for policy in args.policy:
+        for frames_count in args.frames:
+            key = cache.key(digest, policy, frames_count) if cache else None
+            result = cache.get(key) if cache else None
+            if result is not None:
+                result = _cached_row(result)
+            else:
+                result = run_trace(args.trace, policy, frames_count, args.format, args.mmap)
+                if cache:
+                    cache.put(key, result)
+                    result['cached'] = False
+            result['trace'] = args.trace
+            print(json.dumps(result), flush=True)
+
 if __name__ == "__main__":
     # Example quick test (uncomment to run with the example without interactive input)
     # refs = [7,0,1,2,0,3,0,4,2,3,0,3,2]
@@ -163,5 +1759,5 @@ if __name__ == "__main__":
     # t_fifo, f_fifo = simulate_fifo(refs, frames_count)
     # print_timeline(t_fifo, frames_count, refs)
     # print("Faults FIFO:", f_fifo)
-    # To use interactive mode:
-    run_interactive()
+    # Interactive mode with no arguments, see --help for trace files:
+    main()